@@ -1,96 +1,645 @@
 #!/usr/bin/env python3
 """
-Analyze a single event clip using VLM to get a narrative description
+Analyze event clips using VLM to get a narrative description
 """
 import argparse
+import asyncio
+import base64
+import hashlib
+import json
 import sys
 import os
+import re
 import cv2
+import math
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Callable, List
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.vlm_analyzer import VLMAnalyzer
-from src.video_processor import get_video_info
+from src.video_processor import probe_video_info
 import config
 
 
-def extract_clip_frames(clip_path: str, num_frames: int = 5) -> List[str]:
+try:
+    import av
+except ImportError:
+    av = None
+
+try:
+    from turbojpeg import TurboJPEG
+    _tj = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    # Package or the libturbojpeg shared library is missing
+    _tj = None
+
+
+def _encode_jpeg(frame) -> bytes:
+    """Encode a BGR frame as JPEG bytes (libjpeg-turbo when available)."""
+    if _tj is not None:
+        return _tj.encode(frame, quality=85)
+    ok, buf = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 85])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return buf.tobytes()
+
+
+def _encode_write(frame_path: str, frame) -> None:
+    """Encode a frame as JPEG and write it to disk (runs on a worker thread)."""
+    Path(frame_path).write_bytes(_encode_jpeg(frame))
+
+
+def _encode_data_url(frame) -> str:
+    """Encode a frame as a base64 JPEG data URL (runs on a worker thread)."""
+    b64 = base64.b64encode(_encode_jpeg(frame)).decode('ascii')
+    return f"data:image/jpeg;base64,{b64}"
+
+
+# Event time in clip filenames, e.g. event_007_t217.50s.mp4
+_TS_RE = re.compile(r'_t([\d.]+)s')
+
+
+def parse_clip_timestamp(clip_path: str) -> float:
+    """Event timestamp (seconds) encoded in a clip filename, or 0.0 if absent."""
+    match = _TS_RE.search(Path(clip_path).stem)
+    try:
+        return float(match.group(1)) if match else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _clip_frame_dir(clip_path: str) -> str:
+    """Create and return the temporary frame directory for a clip."""
+    clip_name = Path(clip_path).stem
+    temp_frame_dir = os.path.join(config.FRAMES_DIR, f"clip_{clip_name}")
+    os.makedirs(temp_frame_dir, exist_ok=True)
+    return temp_frame_dir
+
+
+def _clip_frame_targets(frame_count: int, num_frames: int) -> List[int]:
+    """Exactly num_frames evenly spaced frame indices, first and last frame included."""
+    if frame_count <= 0 or num_frames <= 0:
+        return []
+    return np.unique(np.linspace(0, frame_count - 1, num_frames, dtype=np.int64)).tolist()
+
+
+def _downscale(frame, max_side: int):
+    """Resize a frame so its longest side is at most max_side (0 disables)."""
+    if max_side:
+        h, w = frame.shape[:2]
+        scale = max_side / max(h, w)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    return frame
+
+
+def _cuda_available() -> bool:
+    """Check for a CUDA GPU without making torch a hard dependency."""
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+def _open_pyav(clip_path: str):
+    """Open a clip with PyAV, requesting hardware decode when available."""
+    device_type = None
+    if sys.platform == 'darwin':
+        device_type = 'videotoolbox'
+    elif _cuda_available():
+        device_type = 'cuda'
+    
+    if device_type:
+        try:
+            from av.codec.hwaccel import HWAccel
+            return av.open(clip_path, hwaccel=HWAccel(device_type=device_type))
+        except Exception:
+            # Older PyAV without hwaccel support, or no usable device
+            pass
+    
+    return av.open(clip_path)
+
+
+def _iter_clip_frames_pyav(clip_path: str, num_frames: int, frame_count: int = None):
+    """
+    Decode the sampled frames of a clip with PyAV.
+    
+    Uses hardware decode (VideoToolbox on macOS, NVDEC with a CUDA GPU)
+    when PyAV supports it, and multi-threaded software decode otherwise.
+    
+    Yields:
+        (frame_index, timestamp, BGR frame) tuples in order
+    """
+    if av is None:
+        raise ImportError("PyAV is not installed")
+    
+    container = _open_pyav(clip_path)
+    try:
+        stream = container.streams.video[0]
+        stream.codec_context.thread_type = 'AUTO'
+        
+        video_fps = float(stream.average_rate) if stream.average_rate else 0.0
+        if not frame_count:
+            frame_count = stream.frames
+        if not frame_count and stream.duration and stream.time_base:
+            frame_count = int(float(stream.duration * stream.time_base) * video_fps)
+        
+        targets = _clip_frame_targets(frame_count, num_frames)
+        if not targets:
+            return
+        
+        target_set = set(targets)
+        for idx, frame in enumerate(container.decode(stream)):
+            if idx in target_set:
+                timestamp = idx / video_fps if video_fps > 0 else 0
+                yield idx, timestamp, frame.to_ndarray(format='bgr24')
+            if idx >= targets[-1]:
+                break
+    finally:
+        container.close()
+
+
+def _iter_clip_frames_opencv(clip_path: str, num_frames: int, frame_count: int = None):
+    """
+    Decode the sampled frames of a clip with OpenCV in a single forward pass.
+    
+    grab() advances the decoder without the color conversion/copy that
+    read() does, so only the target frames pay for retrieve().
+    
+    Yields:
+        (frame_index, timestamp, BGR frame) tuples in order
+    """
+    cap = cv2.VideoCapture(clip_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open clip: {clip_path}")
+    
+    try:
+        video_fps = cap.get(cv2.CAP_PROP_FPS)
+        if not frame_count:
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        
+        target_iter = iter(_clip_frame_targets(frame_count, num_frames))
+        next_target = next(target_iter, None)
+        idx = 0
+        while next_target is not None:
+            if not cap.grab():
+                break
+            if idx == next_target:
+                ret, frame = cap.retrieve()
+                if ret:
+                    timestamp = idx / video_fps if video_fps > 0 else 0
+                    yield idx, timestamp, frame
+                next_target = next(target_iter, None)
+            idx += 1
+    finally:
+        cap.release()
+
+
+def _iter_clip_frames(clip_path: str, num_frames: int, frame_count: int = None):
+    """
+    Decode the sampled frames of a clip, preferring the PyAV backend when
+    installed and falling back to OpenCV if it is missing or yields nothing.
+    """
+    if av is not None:
+        frames = _iter_clip_frames_pyav(clip_path, num_frames, frame_count)
+        try:
+            first = next(frames, None)
+        except Exception as e:
+            print(f"   ⚠️  PyAV decode failed ({e}), falling back to OpenCV")
+            first = None
+        if first is not None:
+            yield first
+            yield from frames
+            return
+    
+    yield from _iter_clip_frames_opencv(clip_path, num_frames, frame_count)
+
+
+def _iter_encoded_clip_frames(decoded, encode, num_frames: int, max_side: int):
+    """
+    Downscale decoded frames and run encode(index, timestamp, frame) on each,
+    yielding the results in frame order as soon as they are ready.
+    
+    Encoding runs on worker threads (OpenCV releases the GIL in imencode)
+    so it overlaps with decoding the following frames.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(4, num_frames))) as pool:
+        pending = deque()
+        for idx, timestamp, frame in decoded:
+            pending.append(pool.submit(encode, idx, timestamp, _downscale(frame, max_side).copy()))
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+        # Re-raises any encode/write error
+        while pending:
+            yield pending.popleft().result()
+
+
+def _encode_clip_frames(decoded, encode, num_frames: int, max_side: int) -> list:
+    """Downscale and encode all decoded frames (see _iter_encoded_clip_frames)."""
+    return list(_iter_encoded_clip_frames(decoded, encode, num_frames, max_side))
+
+
+def _clip_frame_saver(clip_path: str):
+    """Encoder for _encode_clip_frames that writes JPEGs and returns their paths."""
+    temp_frame_dir = _clip_frame_dir(clip_path)
+    
+    def save(idx, timestamp, frame):
+        frame_filename = f"frame_{idx:06d}_t{timestamp:.2f}.jpg"
+        frame_path = os.path.join(temp_frame_dir, frame_filename)
+        _encode_write(frame_path, frame)
+        return frame_path
+    
+    return save
+
+
+def extract_clip_frames_pyav(clip_path: str, num_frames: int = 5, max_side: int = None,
+                             frame_count: int = None) -> List[str]:
+    """
+    Extract sample frames from a clip using PyAV.
+    
+    Uses hardware decode (VideoToolbox on macOS, NVDEC with a CUDA GPU)
+    when PyAV supports it, and multi-threaded software decode otherwise.
+    
+    Args:
+        clip_path: Path to the video clip
+        num_frames: Number of frames to extract (default: 5)
+        max_side: Maximum width/height of saved frames (default: from config, 0 disables)
+        frame_count: Known number of frames in the clip (default: read from the container)
+        
+    Returns:
+        List of frame file paths
+    """
+    if max_side is None:
+        max_side = config.CLIP_FRAME_MAX_SIDE
+    
+    decoded = _iter_clip_frames_pyav(clip_path, num_frames, frame_count)
+    return _encode_clip_frames(decoded, _clip_frame_saver(clip_path), num_frames, max_side)
+
+
+def extract_clip_frames(clip_path: str, num_frames: int = 5, max_side: int = None,
+                        frame_count: int = None) -> List[str]:
     """
     Extract sample frames from a clip.
     
+    Frames are downscaled so their longest side is at most max_side before
+    encoding. GPT-4 Vision resizes images internally anyway, so this only
+    cuts upload bytes and encode work without hurting analysis accuracy.
+    
+    Prefers the PyAV backend (hardware decode) when installed and falls
+    back to OpenCV otherwise.
+    
     Args:
         clip_path: Path to the video clip
         num_frames: Number of frames to extract (default: 5)
+        max_side: Maximum width/height of saved frames (default: from config, 0 disables)
+        frame_count: Known number of frames in the clip (default: read from the container)
         
     Returns:
         List of frame file paths
     """
-    # Create temporary directory for frames
-    clip_name = Path(clip_path).stem
-    temp_frame_dir = os.path.join(config.FRAMES_DIR, f"clip_{clip_name}")
-    os.makedirs(temp_frame_dir, exist_ok=True)
+    if max_side is None:
+        max_side = config.CLIP_FRAME_MAX_SIDE
     
-    cap = cv2.VideoCapture(clip_path)
-    if not cap.isOpened():
-        raise ValueError(f"Could not open clip: {clip_path}")
+    decoded = _iter_clip_frames(clip_path, num_frames, frame_count)
+    return _encode_clip_frames(decoded, _clip_frame_saver(clip_path), num_frames, max_side)
+
+
+def iter_clip_frames(clip_path: str, num_frames: int = 5, max_side: int = None,
+                     frame_count: int = None):
+    """
+    Like extract_clip_frames, but yields each frame path as soon as it is
+    written so callers can show progress.
     
-    video_fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    duration = frame_count / video_fps if video_fps > 0 else 0
+    Yields:
+        Frame file paths in temporal order
+    """
+    if max_side is None:
+        max_side = config.CLIP_FRAME_MAX_SIDE
     
-    frame_paths = []
+    decoded = _iter_clip_frames(clip_path, num_frames, frame_count)
+    yield from _iter_encoded_clip_frames(decoded, _clip_frame_saver(clip_path), num_frames, max_side)
+
+
+def extract_clip_frames_datauri(clip_path: str, num_frames: int = 5, max_side: int = None,
+                                frame_count: int = None) -> List[str]:
+    """
+    Extract sample frames from a clip as in-memory JPEG data URLs.
     
-    # Extract frames at evenly spaced intervals
-    if frame_count > 0:
-        step = max(1, frame_count // num_frames)
-        for i in range(0, frame_count, step):
-            if len(frame_paths) >= num_frames:
-                break
-            
-            cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-            ret, frame = cap.read()
-            if ret:
-                timestamp = i / video_fps if video_fps > 0 else 0
-                frame_filename = f"frame_{i:06d}_t{timestamp:.2f}.jpg"
-                frame_path = os.path.join(temp_frame_dir, frame_filename)
-                cv2.imwrite(frame_path, frame)
-                frame_paths.append(frame_path)
-    
-    # Always include the last frame if we haven't already
-    if frame_count > 0 and len(frame_paths) < num_frames:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count - 1)
-        ret, frame = cap.read()
-        if ret:
-            timestamp = (frame_count - 1) / video_fps if video_fps > 0 else 0
-            frame_filename = f"frame_{frame_count-1:06d}_t{timestamp:.2f}.jpg"
-            frame_path = os.path.join(temp_frame_dir, frame_filename)
-            cv2.imwrite(frame_path, frame)
-            if frame_path not in frame_paths:
-                frame_paths.append(frame_path)
-    
-    cap.release()
-    
-    return frame_paths
+    Same sampling as extract_clip_frames, but nothing touches the disk:
+    the returned data URLs can be passed straight to
+    VLMAnalyzer.analyze_clip_sequence in place of frame paths.
+    
+    Args:
+        clip_path: Path to the video clip
+        num_frames: Number of frames to extract (default: 5)
+        max_side: Maximum width/height of frames (default: from config, 0 disables)
+        frame_count: Known number of frames in the clip (default: read from the container)
+        
+    Returns:
+        List of "data:image/jpeg;base64,..." strings
+    """
+    if max_side is None:
+        max_side = config.CLIP_FRAME_MAX_SIDE
+    
+    decoded = _iter_clip_frames(clip_path, num_frames, frame_count)
+    return _encode_clip_frames(
+        decoded, lambda idx, timestamp, frame: _encode_data_url(frame), num_frames, max_side
+    )
+
+
+def _tile_frames(frames, num_tiles: int, max_side: int):
+    """
+    Resize frames straight into a preallocated grid image, in reading order.
+    
+    Tiles share the first frame's aspect ratio; unused tiles stay black.
+    
+    Returns:
+        (grid image or None if no frames, number of frames tiled)
+    """
+    cols = math.ceil(math.sqrt(num_tiles))
+    rows = math.ceil(num_tiles / cols)
+    grid = None
+    count = 0
+    
+    for frame in frames:
+        if count == rows * cols:
+            break
+        if grid is None:
+            h, w = frame.shape[:2]
+            scale = min(max_side / (cols * w), max_side / (rows * h), 1.0)
+            tile_w, tile_h = max(1, int(w * scale)), max(1, int(h * scale))
+            grid = np.zeros((rows * tile_h, cols * tile_w, 3), dtype=np.uint8)
+        
+        r, c = divmod(count, cols)
+        cv2.resize(frame, (tile_w, tile_h),
+                   dst=grid[r * tile_h:(r + 1) * tile_h, c * tile_w:(c + 1) * tile_w],
+                   interpolation=cv2.INTER_AREA)
+        count += 1
+    
+    return grid, count
+
+
+def build_frame_grid(frame_paths: List[str], output_path: str, max_side: int = 1024) -> str:
+    """
+    Tile clip frames into a single grid image in reading order.
+    
+    The VLM charges per image, so one grid costs about the same as a single
+    frame. The grid is kept within max_side so it stays in the standard
+    (non high-detail) pricing tier.
+    
+    Args:
+        frame_paths: Frame image paths in temporal order
+        output_path: Where to save the grid JPEG
+        max_side: Maximum width/height of the grid image (default: 1024)
+        
+    Returns:
+        Path to the grid image
+    """
+    frames = (cv2.imread(p) for p in frame_paths)
+    grid, _ = _tile_frames((f for f in frames if f is not None), len(frame_paths), max_side)
+    if grid is None:
+        raise ValueError("No readable frames to build grid from")
+    
+    Path(output_path).write_bytes(_encode_jpeg(grid))
+    return output_path
+
+
+def build_clip_grid(clip_path: str, output_path: str, num_frames: int = 5,
+                    max_side: int = 1024, frame_count: int = None) -> int:
+    """
+    Decode sampled clip frames directly into a grid image, without writing
+    the individual frames to disk first.
+    
+    Args:
+        clip_path: Path to event clip
+        output_path: Where to save the grid JPEG
+        num_frames: Number of frames to sample from the clip
+        max_side: Maximum width/height of the grid image (default: 1024)
+        frame_count: Clip frame count if already known (skips a probe)
+        
+    Returns:
+        Number of frames in the grid (0 if none could be decoded)
+    """
+    decoded = (frame for _, _, frame in _iter_clip_frames(clip_path, num_frames, frame_count))
+    grid, count = _tile_frames(decoded, num_frames, max_side)
+    if grid is not None:
+        Path(output_path).write_bytes(_encode_jpeg(grid))
+    return count
+
+
+def _vlm_cache_path(frame_paths: List[str], clip_info: dict, max_cost: float) -> Path:
+    """
+    Cache file for a clip analysis, keyed by the SHA-256 of the frame bytes
+    plus everything else that goes into the request.
+    """
+    h = hashlib.sha256()
+    for frame_path in frame_paths:
+        if frame_path.startswith('data:'):
+            h.update(frame_path.encode())
+        else:
+            h.update(Path(frame_path).read_bytes())
+    h.update(config.OPENAI_MODEL.encode())
+    h.update(str(max_cost).encode())
+    h.update(f"{clip_info.get('timestamp', 0):.2f}|{clip_info.get('duration', 0):.2f}".encode())
+    return Path(config.VLM_CACHE_DIR) / f"{h.hexdigest()}.json"
+
+
+def _prepare_clip(clip_path: str, args, log: Callable[[str], None] = print) -> tuple:
+    """
+    Extract the frames of one clip and look up a cached analysis for them.
+    Progress messages go to log (default: print).
+    
+    Returns:
+        (vlm_frame_paths, clip_info_dict, grid_frames, cache_path, cached_analysis)
+    """
+    # Check if clip exists
+    if not os.path.exists(clip_path):
+        raise FileNotFoundError(f"Clip file not found: {clip_path}")
+    
+    log("=" * 60)
+    log("Event Clip Analysis")
+    log("=" * 60)
+    log(f"\nClip: {clip_path}\n")
+    
+    # Get clip info
+    log("📹 Getting clip information...")
+    clip_info = probe_video_info(clip_path)
+    log(f"✅ Duration: {clip_info['duration']:.2f}s, {clip_info['width']}x{clip_info['height']}, {clip_info['fps']:.2f} FPS\n")
+    
+    # Extract frames (grid layout decodes straight into one image:
+    # one image charge per clip, no per-frame JPEGs)
+    grid_frames = 0
+    if args.layout == 'grid':
+        log(f"🎞️  Extracting {args.num_frames} frames from clip into a grid...")
+        frame_dir = _clip_frame_dir(clip_path)
+        grid_path = os.path.join(frame_dir, "grid.jpg")
+        grid_frames = build_clip_grid(clip_path, grid_path, args.num_frames,
+                                      frame_count=clip_info['frame_count'])
+        vlm_frame_paths = [grid_path] if grid_frames else []
+        log(f"✅ Packed {grid_frames} frames into grid: {grid_path}\n")
+    else:
+        log(f"🎞️  Extracting {args.num_frames} frames from clip...")
+        extract = extract_clip_frames_datauri if args.in_memory else extract_clip_frames
+        vlm_frame_paths = extract(clip_path, args.num_frames, args.max_side, clip_info['frame_count'])
+        log(f"✅ Extracted {len(vlm_frame_paths)} frames\n")
+    
+    if not vlm_frame_paths:
+        raise ValueError("No frames extracted from clip")
+    
+    # Analyze with VLM
+    log("🤖 Analyzing clip with GPT-4 Vision...")
+    log(f"   💰 Budget: ${args.max_cost:.2f}\n")
+    
+    clip_info_dict = {
+        'timestamp': parse_clip_timestamp(clip_path),
+        'duration': clip_info['duration'],
+        'clip_path': clip_path
+    }
+    
+    # Reuse a previous analysis of identical frames (no API cost)
+    analysis = None
+    cache_path = None
+    if not args.no_cache:
+        cache_path = _vlm_cache_path(vlm_frame_paths, clip_info_dict, args.max_cost)
+        if cache_path.exists():
+            analysis = {**json.loads(cache_path.read_text()), 'cost': 0.0, 'cached': True}
+            log(f"   📁 Using cached analysis: {cache_path}")
+    
+    return vlm_frame_paths, clip_info_dict, grid_frames, cache_path, analysis
+
+
+def _report_clip(clip_path: str, analysis: dict, cache_path, analyzer: VLMAnalyzer, args,
+                 log: Callable[[str], None] = print):
+    """Cache a fresh analysis and print the results for one clip."""
+    # Only cache successful analyses
+    if cache_path is not None and not analysis.get('cached') and analysis.get('method') == 'vlm':
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(analysis))
+    
+    # Print results
+    log("\n" + "=" * 60)
+    log(f"ANALYSIS RESULTS: {Path(clip_path).name}")
+    log("=" * 60)
+    log(f"\n📋 Event Type: {analysis.get('event_type', 'Unknown')}")
+    log(f"🎯 Confidence: {analysis.get('confidence', 'Unknown').upper()}")
+    log(f"🤖 Detection Method: {analysis.get('method', 'vlm').upper()}")
+    log(f"\n📝 Description:")
+    log(f"   {analysis.get('description', 'No description available')}")
+    
+    narrative = analysis.get('narrative', '')
+    if narrative:
+        log(f"\n📖 Narrative (What happened in the clip):")
+        log(f"   {narrative}")
+    
+    log(f"\n💰 Cost: ${analysis.get('cost', 0):.4f}")
+    log(f"📸 Frames Analyzed: {analysis.get('frames_analyzed', 0)}")
+    
+    cost_summary = analyzer.get_cost_summary()
+    log(f"\n📊 Total Budget Used: ${cost_summary['total_cost']:.2f} / ${args.max_cost:.2f} ({cost_summary['budget_utilization']})")
+    
+    # Show raw response if available
+    if 'raw_response' in analysis and analysis['raw_response']:
+        log(f"\n📄 Raw Response:")
+        log("-" * 60)
+        log(analysis['raw_response'])
+    
+    log("\n" + "=" * 60)
+
+
+def _process_one_clip(clip_path: str, analyzer: VLMAnalyzer, args) -> dict:
+    """
+    Extract frames from one clip and analyze them with a shared VLM analyzer.
+    
+    Args:
+        clip_path: Path to event clip
+        analyzer: VLMAnalyzer reused across clips (keeps its API connection alive)
+        args: Parsed command-line arguments
+        
+    Returns:
+        Analysis dictionary
+    """
+    vlm_frame_paths, clip_info_dict, grid_frames, cache_path, analysis = _prepare_clip(clip_path, args)
+    if analysis is None:
+        analysis = analyzer.analyze_clip_sequence(vlm_frame_paths, clip_info_dict, grid_frames)
+    _report_clip(clip_path, analysis, cache_path, analyzer, args)
+    return analysis
+
+
+async def _process_clips_async(clip_paths: List[str], analyzer: VLMAnalyzer, args) -> int:
+    """
+    Analyze clips with up to args.concurrency VLM requests in flight.
+    
+    Frame extraction runs in worker threads; results are printed as each clip finishes.
+    
+    Returns:
+        Number of clips that failed
+    """
+    sem = asyncio.Semaphore(args.concurrency)
+    
+    async def go(clip_path: str) -> bool:
+        # Each clip's output is printed in one piece once it finishes, not interleaved with other clips
+        lines = []
+        async with sem:
+            try:
+                vlm_frame_paths, clip_info_dict, grid_frames, cache_path, analysis = \
+                    await asyncio.to_thread(_prepare_clip, clip_path, args, lines.append)
+            except (FileNotFoundError, ValueError) as e:
+                lines.append(f"❌ Error: {str(e)}")
+                print("\n".join(lines))
+                return False
+            if analysis is None:
+                analysis = await analyzer.analyze_clip_sequence_async(vlm_frame_paths, clip_info_dict, grid_frames)
+            _report_clip(clip_path, analysis, cache_path, analyzer, args, lines.append)
+            print("\n".join(lines))
+            return True
+    
+    # One client per event loop: httpx connections can't be reused across asyncio.run calls
+    analyzer.async_client = analyzer.new_async_client()
+    try:
+        results = await asyncio.gather(*[go(p) for p in clip_paths])
+    finally:
+        await analyzer.async_client.close()
+        analyzer.async_client = None
+    return results.count(False)
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description='Analyze a single event clip using VLM to get a narrative description'
+        description='Analyze event clips using VLM to get a narrative description'
     )
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         '--clip',
         type=str,
-        required=True,
         help='Path to the event clip file (e.g., outputs/clips/O3fAVQ8Wm60/event_007_t217.50s.mp4)'
     )
+    source.add_argument(
+        '--batch-file',
+        type=str,
+        help='Analyze every clip listed in this file (one path per line)'
+    )
+    source.add_argument(
+        '--stdin',
+        action='store_true',
+        help='Analyze every clip path read from stdin (one path per line)'
+    )
     parser.add_argument(
         '--max-cost',
         type=float,
         default=1.0,
-        help='Maximum cost in USD for VLM analysis (default: 1.0)'
+        help='Maximum cost in USD for VLM analysis, shared across all clips in a batch (default: 1.0)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=4,
+        help='Number of clips analyzed at once in batch mode (default: 4)'
     )
     parser.add_argument(
         '--num-frames',
@@ -98,85 +647,62 @@ def main():
         default=5,
         help='Number of frames to extract from clip (default: 5)'
     )
+    parser.add_argument(
+        '--max-side',
+        type=int,
+        default=config.CLIP_FRAME_MAX_SIDE,
+        help=f'Downscale extracted frames to this longest side in pixels, 0 to keep full resolution (default: {config.CLIP_FRAME_MAX_SIDE})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always call the VLM, ignoring cached results for identical frames'
+    )
+    parser.add_argument(
+        '--layout',
+        choices=['individual', 'grid'],
+        default='individual',
+        help='Send frames as separate images, or tiled into one grid image to cut vision tokens (default: individual)'
+    )
+    parser.add_argument(
+        '--in-memory',
+        action='store_true',
+        help='Keep extracted frames in memory as data URLs instead of writing JPEGs to disk'
+    )
     
     args = parser.parse_args()
+    if args.in_memory and args.layout == 'grid':
+        parser.error("--in-memory cannot be combined with --layout grid")
     
-    # Check if clip exists
-    if not os.path.exists(args.clip):
-        print(f"❌ Error: Clip file not found: {args.clip}")
-        sys.exit(1)
+    if args.clip:
+        clip_paths = [args.clip]
+    elif args.batch_file:
+        with open(args.batch_file) as f:
+            clip_paths = [line.strip() for line in f if line.strip()]
+    else:
+        clip_paths = [line.strip() for line in sys.stdin if line.strip()]
     
-    print("=" * 60)
-    print("Event Clip Analysis")
-    print("=" * 60)
-    print(f"\nClip: {args.clip}\n")
+    batch = args.clip is None
+    failed = 0
     
     try:
-        # Get clip info
-        print("📹 Getting clip information...")
-        clip_info = get_video_info(args.clip)
-        print(f"✅ Duration: {clip_info['duration']:.2f}s, {clip_info['width']}x{clip_info['height']}, {clip_info['fps']:.2f} FPS\n")
-        
-        # Extract frames
-        print(f"🎞️  Extracting {args.num_frames} frames from clip...")
-        frame_paths = extract_clip_frames(args.clip, args.num_frames)
-        print(f"✅ Extracted {len(frame_paths)} frames\n")
-        
-        if not frame_paths:
-            print("❌ Error: No frames extracted from clip")
-            sys.exit(1)
-        
-        # Analyze with VLM
-        print("🤖 Analyzing clip with GPT-4 Vision...")
-        print(f"   💰 Budget: ${args.max_cost:.2f}\n")
-        
+        # One analyzer (and one API client) for every clip
         analyzer = VLMAnalyzer(max_cost=args.max_cost)
         
-        # Extract timestamp from filename if possible
-        clip_name = Path(args.clip).stem
-        timestamp = 0.0
-        if '_t' in clip_name:
-            try:
-                timestamp = float(clip_name.split('_t')[1].replace('s', ''))
-            except:
-                pass
-        
-        clip_info_dict = {
-            'timestamp': timestamp,
-            'duration': clip_info['duration'],
-            'clip_path': args.clip
-        }
-        
-        analysis = analyzer.analyze_clip_sequence(frame_paths, clip_info_dict)
-        
-        # Print results
-        print("\n" + "=" * 60)
-        print("ANALYSIS RESULTS")
-        print("=" * 60)
-        print(f"\n📋 Event Type: {analysis.get('event_type', 'Unknown')}")
-        print(f"🎯 Confidence: {analysis.get('confidence', 'Unknown').upper()}")
-        print(f"🤖 Detection Method: {analysis.get('method', 'vlm').upper()}")
-        print(f"\n📝 Description:")
-        print(f"   {analysis.get('description', 'No description available')}")
-        
-        narrative = analysis.get('narrative', '')
-        if narrative:
-            print(f"\n📖 Narrative (What happened in the clip):")
-            print(f"   {narrative}")
+        if batch and args.concurrency > 1:
+            failed = asyncio.run(_process_clips_async(clip_paths, analyzer, args))
+        else:
+            for clip_path in clip_paths:
+                try:
+                    _process_one_clip(clip_path, analyzer, args)
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"❌ Error: {str(e)}")
+                    if not batch:
+                        sys.exit(1)
+                    failed += 1
         
-        print(f"\n💰 Cost: ${analysis.get('cost', 0):.4f}")
-        print(f"📸 Frames Analyzed: {analysis.get('frames_analyzed', 0)}")
-        
-        cost_summary = analyzer.get_cost_summary()
-        print(f"\n📊 Total Budget Used: ${cost_summary['total_cost']:.2f} / ${args.max_cost:.2f} ({cost_summary['budget_utilization']})")
-        
-        # Show raw response if available
-        if 'raw_response' in analysis and analysis['raw_response']:
-            print(f"\n📄 Raw Response:")
-            print("-" * 60)
-            print(analysis['raw_response'])
-        
-        print("\n" + "=" * 60)
+        if batch:
+            print(f"\n✅ Analyzed {len(clip_paths) - failed}/{len(clip_paths)} clips")
         
     except KeyboardInterrupt:
         print("\n\n❌ Process interrupted by user")
@@ -186,8 +712,10 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
     main()
-
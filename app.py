@@ -2,35 +2,75 @@
 Streamlit dashboard for visualizing garbage bin event detection results
 """
 import streamlit as st
+import hashlib
 import json
+from bisect import bisect_left, bisect_right
+import math
 import os
+import numpy as np
 import plotly.graph_objects as go
+import pandas as pd
+from collections import Counter
 from pathlib import Path
 from PIL import Image
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Load .env file BEFORE importing config
+# (Streamlit re-runs this script on every interaction, so only do it once per session)
 from dotenv import load_dotenv
-env_path = Path(__file__).parent / '.env'
-if env_path.exists():
-    load_dotenv(dotenv_path=env_path)
-else:
-    load_dotenv()
+_APP_DIR = Path(__file__).resolve().parent
+_ENV_PATH = _APP_DIR / '.env'
+if '_env_loaded' not in st.session_state:
+    if _ENV_PATH.exists():
+        load_dotenv(dotenv_path=_ENV_PATH)
+    else:
+        load_dotenv()
+    st.session_state['_env_loaded'] = True
 
 import config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent))
+if str(_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(_APP_DIR))
 
 from src.vlm_analyzer import VLMAnalyzer
-from src.video_processor import get_video_info
-from analyze_clip import extract_clip_frames
+from src.video_processor import get_video_info, transcode_to_h264
+from analyze_clip import iter_clip_frames, parse_clip_timestamp
+
+
+CONFIDENCE_LEVELS = ['All', 'High', 'Medium', 'Low']
+THUMBNAIL_SIZE = (480, 270)
+EVENT_TABLE_COLUMNS = ['event_id', 'event_type', 'timestamp_formatted', 'confidence', 'duration']
+CONFIDENCE_GLYPHS = {
+    'high': '🟢',
+    'medium': '🟡',
+    'low': '🔴'
+}
+COLOR_MAP = {
+    'high': 'green',
+    'medium': 'orange',
+    'low': 'red'
+}
+
+
+@st.cache_data(show_spinner="Converting clip for browser playback...")
+def _playable_clip(clip_path: str, mtime: float) -> str:
+    """Path of a browser-playable (H.264) version of the clip, cached per (path, mtime)"""
+    return transcode_to_h264(clip_path)
 
 
 def display_video(clip_path: str):
     """
     Display video in Streamlit with proper error handling.
-    Uses bytes method for better compatibility with Streamlit's media server.
+    Passes the file path so Streamlit's media endpoint serves it (with HTTP
+    range requests) instead of the script reading the whole clip on every rerun.
     
     Note: Videos created with 'mp4v' codec may not play in all browsers.
     For best compatibility, videos should be encoded with H.264 (avc1) codec.
@@ -42,69 +82,186 @@ def display_video(clip_path: str):
     abs_path = os.path.abspath(clip_path)
     
     try:
-        # Read video as bytes - this bypasses Streamlit's file path resolution
-        # which can have issues with certain codecs
-        with open(abs_path, 'rb') as video_file:
-            video_bytes = video_file.read()
-            
         # Check file size - warn if very large (might cause performance issues)
-        file_size_mb = len(video_bytes) / (1024 * 1024)
+        file_size_mb = os.path.getsize(abs_path) / (1024 * 1024)
         if file_size_mb > 50:
             st.warning(f"⚠️ Large video file ({file_size_mb:.1f} MB). Loading may take a moment...")
         
-        # Use bytes directly - Streamlit will serve it through its media endpoint
-        # format parameter helps browser understand the video type
-        st.video(video_bytes, format='video/mp4')
+        # Play an H.264 copy of mp4v clips (transcoded once); format parameter
+        # helps browser understand the video type
+        st.video(_playable_clip(abs_path, os.path.getmtime(abs_path)), format='video/mp4')
         
         # Add download link as fallback and note about codec compatibility
         st.caption("💡 If video doesn't play, download it using the link below.")
-        st.download_button(
-            label="⬇️ Download Video",
-            data=video_bytes,
-            file_name=os.path.basename(abs_path),
-            mime='video/mp4'
-        )
+        with open(abs_path, 'rb') as video_file:
+            st.download_button(
+                label="⬇️ Download Video",
+                data=video_file,
+                file_name=os.path.basename(abs_path),
+                mime='video/mp4'
+            )
         
         return True
     except Exception as e:
-        # If bytes method fails, try path method as fallback
-        try:
-            st.video(abs_path)
-            return True
-        except Exception as e2:
-            st.warning(f"⚠️ Could not load video. The video file may use an unsupported codec.")
-            with st.expander("🔍 Video loading error details"):
-                st.write(f"**Path:** `{abs_path}`")
-                st.write(f"**File exists:** {os.path.exists(abs_path)}")
-                if os.path.exists(abs_path):
-                    file_size = os.path.getsize(abs_path)
-                    st.write(f"**File size:** {file_size:,} bytes ({file_size / (1024*1024):.2f} MB)")
-                st.write(f"**Error:** {str(e2)}")
-                st.info("💡 **Tip:** Videos created with 'mp4v' codec may not play in all browsers. Consider re-encoding with H.264 codec for better compatibility.")
-            return False
-
-
-def load_report_data(report_dir: str = None):
-    """Load the most recent JSON report"""
+        st.warning(f"⚠️ Could not load video. The video file may use an unsupported codec.")
+        with st.expander("🔍 Video loading error details"):
+            st.write(f"**Path:** `{abs_path}`")
+            st.write(f"**File exists:** {os.path.exists(abs_path)}")
+            if os.path.exists(abs_path):
+                file_size = os.path.getsize(abs_path)
+                st.write(f"**File size:** {file_size:,} bytes ({file_size / (1024*1024):.2f} MB)")
+            st.write(f"**Error:** {str(e)}")
+            st.info("💡 **Tip:** Videos created with 'mp4v' codec may not play in all browsers. Consider re-encoding with H.264 codec for better compatibility.")
+        return False
+
+
+def _latest_report_entry(report_dir: str):
+    """Return the os.DirEntry of the most recently modified JSON report in report_dir, or None"""
+    if not os.path.exists(report_dir):
+        return None
+    
+    # Single scandir pass; DirEntry caches stat results, no intermediate list
+    with os.scandir(report_dir) as entries:
+        return max(
+            (e for e in entries if e.name.endswith('.json') and e.is_file()),
+            key=lambda e: e.stat().st_mtime,
+            default=None
+        )
+
+
+def _latest_report(report_dir: str):
+    """Return the most recently modified JSON report in report_dir, or None"""
+    entry = _latest_report_entry(report_dir)
+    return Path(entry.path) if entry else None
+
+
+def latest_report_mtime(report_dir: str = None) -> float:
+    """Modification time of the latest report (0.0 if none), used as a cache key"""
     if report_dir is None:
         report_dir = config.REPORTS_DIR
+    entry = _latest_report_entry(report_dir)
+    return entry.stat().st_mtime if entry else 0.0
+
+
+@st.cache_data(show_spinner=False)
+def load_report_data(report_dir: str = None, mtime: float = 0.0):
+    """
+    Load the most recent JSON report.
     
-    if not os.path.exists(report_dir):
-        return None
+    Cached per (report_dir, mtime) so widget interactions don't re-read and
+    re-parse the file; pass latest_report_mtime() so a new report invalidates it.
+    """
+    if report_dir is None:
+        report_dir = config.REPORTS_DIR
     
-    # Find most recent JSON report
-    json_files = list(Path(report_dir).glob("*.json"))
-    if not json_files:
+    latest_report = _latest_report(report_dir)
+    if latest_report is None:
         return None
     
-    # Sort by modification time
-    json_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-    latest_report = json_files[0]
+    if orjson is not None:
+        with open(latest_report, 'rb') as f:
+            return orjson.loads(f.read())
     
     with open(latest_report, 'r') as f:
         return json.load(f)
 
 
+def _is_sampled(event: dict) -> bool:
+    """Whether an event was actually analyzed (i.e. not skipped by sampling)"""
+    return (
+        event.get('vlm_analysis', {}).get('sampled', True) != False
+        and event.get('description', '') != 'Not analyzed (not in sample)'
+    )
+
+
+@st.cache_data(show_spinner=False)
+def load_events_frame(report_dir: str, mtime: float) -> pd.DataFrame:
+    """
+    Columnar view of the report's events for counting and filtering
+    (row i corresponds to events[i]; cached like load_report_data).
+    """
+    events = (load_report_data(report_dir, mtime) or {}).get('events', [])
+    
+    # Collect all columns in a single pass over the events
+    types, confidences, sampled = [], [], []
+    for e in events:
+        types.append(e.get('event_type') or 'Unknown')
+        confidences.append((e.get('confidence') or '').lower())
+        sampled.append(_is_sampled(e))
+    
+    return pd.DataFrame({
+        'event_type': pd.Series(types, dtype=object),
+        'confidence': pd.Series(confidences, dtype=object),
+        'sampled': pd.Series(sampled, dtype=bool),
+    })
+
+
+@st.cache_data(show_spinner=False)
+def event_order(report_dir: str, mtime: float) -> tuple:
+    """
+    Event timestamps in ascending order plus the matching event indices,
+    so a time window can be sliced with bisect.
+    """
+    events = (load_report_data(report_dir, mtime) or {}).get('events', [])
+    order = sorted(range(len(events)), key=lambda i: events[i]['timestamp'])
+    return [events[i]['timestamp'] for i in order], order
+
+
+@st.cache_data(show_spinner=False)
+def apply_filters(report_dir: str, mtime: float, show_filter: str,
+                  selected_event_type: str, selected_confidence: str) -> list:
+    """Filter the events of the cached report (keyed like load_report_data)"""
+    events = (load_report_data(report_dir, mtime) or {}).get('events', [])
+    df = load_events_frame(report_dir, mtime)
+    
+    # Build one boolean mask over the event columns
+    mask = pd.Series(True, index=df.index)
+    if show_filter == "Sampled Only":
+        mask &= df['sampled']
+    elif show_filter == "Unsampled Only":
+        mask &= ~df['sampled']
+    
+    if selected_event_type != 'All':
+        mask &= df['event_type'] == selected_event_type
+    
+    if selected_confidence != 'All':
+        mask &= df['confidence'] == selected_confidence.lower()
+    
+    return [events[i] for i in mask.to_numpy().nonzero()[0]]
+
+
+@st.cache_data(show_spinner=False)
+def _thumbnail(path: str, mtime: float) -> str:
+    """
+    Path of a small JPEG preview of an image, written once per (path, mtime)
+    under config.THUMBS_DIR so reruns don't decode full-resolution frames.
+    Falls back to the original path if the thumbnail can't be written.
+    """
+    key = hashlib.sha1(f"{os.path.abspath(path)}|{mtime}".encode()).hexdigest()
+    thumb_path = os.path.join(config.THUMBS_DIR, f"{key}.jpg")
+    if os.path.exists(thumb_path):
+        return thumb_path
+    try:
+        os.makedirs(config.THUMBS_DIR, exist_ok=True)
+        with Image.open(path) as img:
+            img.draft('RGB', THUMBNAIL_SIZE)  # JPEG: decode at reduced scale
+            img = img.convert('RGB')
+            img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.BILINEAR)
+            img.save(thumb_path, 'JPEG', quality=85)
+        return thumb_path
+    except OSError:
+        return path
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _existence_map(paths: tuple) -> dict:
+    """
+    Stat every media path once: path -> mtime, or None if the file is missing.
+    Short ttl so files created or removed after the report still show up.
+    """
+    return {p: os.path.getmtime(p) if os.path.exists(p) else None for p in paths if p}
+
+
 def format_timestamp(seconds: float) -> str:
     """Format seconds as HH:MM:SS"""
     hours = int(seconds // 3600)
@@ -113,12 +270,56 @@ def format_timestamp(seconds: float) -> str:
     return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
-def create_timeline_figure(events: list, video_duration: float):
-    """Create a timeline visualization of events"""
+def _format_timestamps(seconds) -> np.ndarray:
+    """Vectorized format_timestamp: array of seconds -> array of HH:MM:SS strings"""
+    secs = np.asarray(seconds, dtype=np.float64).astype(np.int64)
+    if secs.size == 0:
+        return np.array([], dtype='<U8')
+    hours, rem = np.divmod(secs, 3600)
+    minutes, secs = np.divmod(rem, 60)
+    hh, mm, ss = (np.char.zfill(a.astype(str), 2) for a in (hours, minutes, secs))
+    return np.char.add(np.char.add(np.char.add(np.char.add(hh, ':'), mm), ':'), ss)
+
+
+def _bin_events(events: list, lo: float, hi: float) -> tuple:
+    """
+    Group events in [lo, hi] into config.TIMELINE_BINS time bins, one marker per non-empty bin.
+    Marker size grows with log(count); color is the bin's most common confidence.
+    """
+    bin_seconds = (hi - lo) / config.TIMELINE_BINS
+    bins = {}
+    for event in events:
+        bins.setdefault(int((event['timestamp'] - lo) // bin_seconds), []).append(event)
+    
+    xs, sizes, colors, texts = [], [], [], []
+    for b in sorted(bins):
+        bin_events = bins[b]
+        start = lo + b * bin_seconds
+        confidence = Counter(e.get('confidence', 'medium').lower() for e in bin_events).most_common(1)[0][0]
+        types = Counter(e.get('event_type', 'Unknown') for e in bin_events)
+        xs.append(start + bin_seconds / 2)
+        sizes.append(10 + 4 * math.log2(len(bin_events)))
+        colors.append(COLOR_MAP.get(confidence, 'gray'))
+        texts.append(
+            f"{len(bin_events)} events ({format_timestamp(start)} - {format_timestamp(start + bin_seconds)})<br>"
+            + "<br>".join(f"{t}: {n}" for t, n in types.most_common())
+        )
+    return xs, sizes, colors, texts
+
+
+def create_timeline_figure(events: list, video_duration: float, exact: bool = False,
+                           x_range: tuple = None):
+    """
+    Create a timeline visualization of events.
+    
+    Reports with more than config.TIMELINE_MAX_MARKERS events are drawn as
+    time bins unless exact is set. If x_range is given, events should already
+    be limited to that window and the x axis is zoomed to it.
+    """
     fig = go.Figure()
     
-    # Add video duration bar
-    fig.add_trace(go.Scatter(
+    # Add video duration bar (WebGL like the markers, so one renderer draws the figure)
+    fig.add_trace(go.Scattergl(
         x=[0, video_duration],
         y=[0, 0],
         mode='lines',
@@ -127,33 +328,35 @@ def create_timeline_figure(events: list, video_duration: float):
         hoverinfo='skip'
     ))
     
-    # Add event markers
-    for event in events:
-        timestamp = event['timestamp']
-        event_type = event.get('event_type', 'Unknown')
-        confidence = event.get('confidence', 'medium')
-        
-        # Color based on confidence
-        color_map = {
-            'high': 'green',
-            'medium': 'orange',
-            'low': 'red'
-        }
-        color = color_map.get(confidence.lower(), 'gray')
-        
-        fig.add_trace(go.Scatter(
-            x=[timestamp],
-            y=[0],
-            mode='markers',
-            marker=dict(
-                size=15,
-                color=color,
-                symbol='diamond'
-            ),
-            name=f"Event {event['event_id']}: {event_type}",
-            text=f"Event {event['event_id']}: {event_type}<br>{format_timestamp(timestamp)}",
-            hovertemplate='<b>%{text}</b><extra></extra>'
-        ))
+    # Add all event markers as a single trace (per-point colors and hover text)
+    lo, hi = x_range or (0, video_duration)
+    if not exact and len(events) > config.TIMELINE_MAX_MARKERS and hi > lo:
+        xs, sizes, colors, texts = _bin_events(events, lo, hi)
+        ids = None
+    else:
+        xs = [e['timestamp'] for e in events]
+        ids = [e['event_id'] for e in events]
+        colors = [COLOR_MAP.get(e.get('confidence', 'medium').lower(), 'gray') for e in events]
+        texts = [
+            f"Event {e['event_id']}: {e.get('event_type', 'Unknown')}<br>{ts}"
+            for e, ts in zip(events, _format_timestamps(xs))
+        ]
+        sizes = 15
+    
+    fig.add_trace(go.Scattergl(
+        x=xs,
+        y=[0] * len(xs),
+        mode='markers',
+        marker=dict(
+            size=sizes,
+            color=colors,
+            symbol='diamond'
+        ),
+        name='Events',
+        text=texts,
+        customdata=ids,
+        hovertemplate='<b>%{text}</b><extra></extra>'
+    ))
     
     fig.update_layout(
         title="Event Timeline",
@@ -161,12 +364,46 @@ def create_timeline_figure(events: list, video_duration: float):
         yaxis=dict(showticklabels=False, range=[-0.5, 0.5]),
         height=200,
         showlegend=False,
-        hovermode='closest'
+        hovermode='closest',
+        hoverdistance=10,
+        spikedistance=-1
     )
+    if x_range:
+        fig.update_xaxes(range=list(x_range))
     
     return fig
 
 
+def _clips_dir_mtime(clips_dir: str) -> float:
+    """Newest mtime of the clips dir and its per-video subdirs (changes when clips are added)"""
+    if not os.path.exists(clips_dir):
+        return 0.0
+    mtimes = [os.path.getmtime(clips_dir)]
+    with os.scandir(clips_dir) as entries:
+        mtimes += [e.stat().st_mtime for e in entries if e.is_dir()]
+    return max(mtimes)
+
+
+def _scan_clips(directory: str, available_clips: list):
+    """Recursively collect .mp4 clips with os.scandir (no extra stat per file)"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                _scan_clips(entry.path, available_clips)
+            # Skip the H.264 playback copies made by transcode_to_h264
+            elif entry.name.endswith('.mp4') and not entry.name.endswith('.h264.mp4'):
+                available_clips.append(entry.path)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_clips(clips_dir: str, mtime: float) -> list:
+    """All .mp4 clips under clips_dir (cached until the directory changes)"""
+    available_clips = []
+    if os.path.exists(clips_dir):
+        _scan_clips(clips_dir, available_clips)
+    return available_clips
+
+
 def analyze_clip_page():
     """Page for analyzing individual event clips"""
     st.header("🎬 Analyze Individual Event Clip")
@@ -176,14 +413,7 @@ def analyze_clip_page():
     
     # Find available clips
     clips_dir = config.CLIPS_DIR
-    available_clips = []
-    
-    if os.path.exists(clips_dir):
-        for root, dirs, files in os.walk(clips_dir):
-            for file in files:
-                if file.endswith('.mp4'):
-                    clip_path = os.path.join(root, file)
-                    available_clips.append(clip_path)
+    available_clips = _list_clips(clips_dir, _clips_dir_mtime(clips_dir))
     
     if not available_clips:
         st.warning("No event clips found. Please run the analysis first using:")
@@ -260,9 +490,9 @@ def analyze_clip_page():
             
             # Debug info
             with st.expander("🔍 Debug Information"):
-                st.write(f"Config file path: {Path(__file__).parent / 'config.py'}")
-                st.write(f".env file path: {Path(__file__).parent / '.env'}")
-                st.write(f".env exists: {(Path(__file__).parent / '.env').exists()}")
+                st.write(f"Config file path: {_APP_DIR / 'config.py'}")
+                st.write(f".env file path: {_ENV_PATH}")
+                st.write(f".env exists: {_ENV_PATH.exists()}")
                 st.write(f"config.OPENAI_API_KEY: {'SET' if config.OPENAI_API_KEY else 'NOT SET'}")
                 st.write(f"os.getenv('OPENAI_API_KEY'): {'SET' if os.getenv('OPENAI_API_KEY') else 'NOT SET'}")
             return
@@ -274,28 +504,31 @@ def analyze_clip_page():
         with st.spinner("Analyzing clip..."):
             try:
                 # Extract timestamp from filename
-                clip_name = Path(selected_clip).stem
-                timestamp = 0.0
-                if '_t' in clip_name:
-                    try:
-                        timestamp = float(clip_name.split('_t')[1].replace('s', ''))
-                    except:
-                        pass
+                timestamp = parse_clip_timestamp(selected_clip)
                 
                 # Extract frames
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
                 status_text.text("Extracting frames...")
-                frame_paths = extract_clip_frames(selected_clip, num_frames)
-                progress_bar.progress(30)
+                
+                # Show each frame as soon as it is extracted
+                st.subheader("🎞️ Extracted Frames")
+                frame_cols = st.columns(min(5, num_frames))
+                frame_paths = []
+                for idx, frame_path in enumerate(
+                    iter_clip_frames(selected_clip, num_frames, frame_count=clip_info['frame_count'])
+                ):
+                    frame_paths.append(frame_path)
+                    with frame_cols[idx % len(frame_cols)]:
+                        st.image(frame_path, caption=f"Frame {idx+1}", use_container_width=True)
+                    progress_bar.progress(int(30 * (idx + 1) / num_frames))
                 
                 if not frame_paths:
                     st.error("Failed to extract frames from clip")
                     return
                 
                 # Analyze with VLM
-                status_text.text(f"Analyzing {len(frame_paths)} frames with GPT-4 Vision...")
                 analyzer = VLMAnalyzer(max_cost=max_cost)
                 
                 clip_info_dict = {
@@ -304,7 +537,17 @@ def analyze_clip_page():
                     'clip_path': selected_clip
                 }
                 
-                analysis = analyzer.analyze_clip_sequence(frame_paths, clip_info_dict)
+                # Run the API call on a worker thread so the page keeps updating while waiting
+                start = time.monotonic()
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    future = pool.submit(analyzer.analyze_clip_sequence, frame_paths, clip_info_dict)
+                    while not future.done():
+                        elapsed = time.monotonic() - start
+                        status_text.text(f"Analyzing {len(frame_paths)} frames with GPT-4 Vision... ({elapsed:.0f}s)")
+                        # Approaches 95% while the request is in flight
+                        progress_bar.progress(30 + int(65 * (1 - math.exp(-elapsed / 10))))
+                        time.sleep(0.25)
+                    analysis = future.result()
                 progress_bar.progress(100)
                 status_text.text("Analysis complete!")
                 
@@ -319,13 +562,8 @@ def analyze_clip_page():
                     st.metric("Event Type", event_type)
                 
                 with col2:
-                    confidence = analysis.get('confidence', 'medium').upper()
-                    confidence_colors = {
-                        'HIGH': '🟢',
-                        'MEDIUM': '🟡',
-                        'LOW': '🔴'
-                    }
-                    st.metric("Confidence", f"{confidence_colors.get(confidence, '⚪')} {confidence}")
+                    confidence = analysis.get('confidence', 'medium')
+                    st.metric("Confidence", f"{CONFIDENCE_GLYPHS.get(confidence.lower(), '⚪')} {confidence.upper()}")
                 
                 with col3:
                     detection_method = analysis.get('method', 'vlm').upper()
@@ -363,17 +601,6 @@ def analyze_clip_page():
                     with st.expander("📄 View Raw VLM Response"):
                         st.text(analysis['raw_response'])
                 
-                # Display extracted frames
-                if frame_paths:
-                    st.markdown("---")
-                    st.subheader("🎞️ Extracted Frames")
-                    frame_cols = st.columns(min(3, len(frame_paths)))
-                    for idx, frame_path in enumerate(frame_paths[:3]):
-                        if os.path.exists(frame_path):
-                            with frame_cols[idx % len(frame_cols)]:
-                                img = Image.open(frame_path)
-                                st.image(img, caption=f"Frame {idx+1}", use_container_width=True)
-                
             except Exception as e:
                 st.error(f"Error analyzing clip: {str(e)}")
                 import traceback
@@ -396,24 +623,29 @@ def main():
     with tab1:
         st.markdown("---")
         
-        # Load report data
-        report_data = load_report_data()
+        # Load report data (cached until a newer report is written)
+        report_dir = config.REPORTS_DIR
+        report_mtime = latest_report_mtime(report_dir)
+        report_data = load_report_data(report_dir, report_mtime)
         
         if report_data is None:
             st.warning("No report data found. Please run the analysis first using:")
             st.code("python main.py --url 'YOUR_YOUTUBE_URL'")
         else:
-            display_report_view(report_data)
+            display_report_view(report_data, report_dir, report_mtime)
     
     with tab2:
         analyze_clip_page()
 
 
-def display_report_view(report_data):
+def display_report_view(report_data, report_dir: str, report_mtime: float):
     """Display the main report view"""
     metadata = report_data.get('metadata', {})
     events = report_data.get('events', [])
     
+    # Event type counts give both the filter options and the summary
+    type_counts = load_events_frame(report_dir, report_mtime)['event_type'].value_counts()
+    
     # Sidebar with video info
     with st.sidebar:
         st.header("Video Information")
@@ -448,35 +680,20 @@ def display_report_view(report_data):
         else:
             show_filter = "All Events"
         
-        event_types = ['All'] + list(set([e.get('event_type', 'Unknown') for e in events]))
-        selected_event_type = st.selectbox("Event Type", event_types)
+        # Filter options only change with the report, so keep them in session state
+        if st.session_state.get('report_sig') != (report_dir, report_mtime):
+            st.session_state['event_types'] = ['All'] + sorted(type_counts.index)
+            st.session_state['report_sig'] = (report_dir, report_mtime)
+            if st.session_state.get('sel_type') not in st.session_state['event_types']:
+                st.session_state.pop('sel_type', None)
+        selected_event_type = st.selectbox("Event Type", st.session_state['event_types'], key='sel_type')
         
-        confidence_levels = ['All', 'High', 'Medium', 'Low']
-        selected_confidence = st.selectbox("Confidence", confidence_levels)
+        selected_confidence = st.selectbox("Confidence", CONFIDENCE_LEVELS, key='sel_confidence')
         
         # Apply filters
-        filtered_events = events
-        
-        # Apply sampling filter first
-        if show_filter == "Sampled Only":
-            # Only show events that were actually analyzed (have real VLM analysis)
-            filtered_events = [
-                e for e in filtered_events 
-                if e.get('vlm_analysis', {}).get('sampled', True) != False 
-                and e.get('description', '') != 'Not analyzed (not in sample)'
-            ]
-        elif show_filter == "Unsampled Only":
-            filtered_events = [
-                e for e in filtered_events 
-                if e.get('vlm_analysis', {}).get('sampled', True) == False 
-                or e.get('description', '') == 'Not analyzed (not in sample)'
-            ]
-        
-        if selected_event_type != 'All':
-            filtered_events = [e for e in filtered_events if e.get('event_type') == selected_event_type]
-        
-        if selected_confidence != 'All':
-            filtered_events = [e for e in filtered_events if e.get('confidence', '').lower() == selected_confidence.lower()]
+        filtered_events = apply_filters(
+            report_dir, report_mtime, show_filter, selected_event_type, selected_confidence
+        )
     
     # Main content
     col1, col2 = st.columns([2, 1])
@@ -484,7 +701,23 @@ def display_report_view(report_data):
     with col1:
         st.subheader("Event Timeline")
         if events:
-            timeline_fig = create_timeline_figure(events, metadata.get('video_duration', 0))
+            video_duration = metadata.get('video_duration', 0)
+            timeline_events, exact, x_range = events, False, None
+            if len(events) > config.TIMELINE_MAX_MARKERS:
+                exact = st.checkbox("Show all events", help="Draw one marker per event instead of grouping them into time bins")
+                if video_duration > 0:
+                    # Only plot the events inside the selected time window
+                    x_range = st.slider(
+                        "Time window (seconds)", 0.0, float(video_duration),
+                        (0.0, float(video_duration)), key=f"x_range_{report_mtime}"
+                    )
+                    timestamps, order = event_order(report_dir, report_mtime)
+                    lo = bisect_left(timestamps, x_range[0])
+                    hi = bisect_right(timestamps, x_range[1])
+                    timeline_events = [events[i] for i in order[lo:hi]]
+                    if len(timeline_events) < len(events):
+                        st.caption(f"⚠️ {len(events) - len(timeline_events)} events hidden outside the time window — widen it to see all")
+            timeline_fig = create_timeline_figure(timeline_events, video_duration, exact, x_range)
             st.plotly_chart(timeline_fig, use_container_width=True)
         else:
             st.info("No events to display")
@@ -496,13 +729,8 @@ def display_report_view(report_data):
         
         # Event type distribution
         if events:
-            event_type_counts = {}
-            for event in events:
-                event_type = event.get('event_type', 'Unknown')
-                event_type_counts[event_type] = event_type_counts.get(event_type, 0) + 1
-            
             st.markdown("**By Event Type:**")
-            for event_type, count in sorted(event_type_counts.items()):
+            for event_type, count in sorted(type_counts.items()):
                 st.write(f"- {event_type}: {count}")
     
     st.markdown("---")
@@ -510,91 +738,124 @@ def display_report_view(report_data):
     # Events list
     st.subheader(f"Events ({len(filtered_events)} found)")
     
+    view = st.radio("View", ["Table", "Cards"], horizontal=True, key='events_view')
+    
     if not filtered_events:
         st.info("No events match the selected filters.")
+    elif view == "Table":
+        # One table widget for all events, plus a single detailed card
+        df = pd.DataFrame(filtered_events, columns=EVENT_TABLE_COLUMNS)
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        
+        selected_id = st.selectbox("Inspect event", df['event_id'], key='inspect_event')
+        event = next(e for e in filtered_events if e['event_id'] == selected_id)
+        exists = _existence_map((event.get('clip_path', ''), event.get('analyzed_frame', '')))
+        display_event_card(event, metadata, exists, expanded=True)
     else:
-        for event in filtered_events:
-            # Determine if event was sampled
-            is_sampled = True
+        # Only build expanders for one page of events
+        num_pages = math.ceil(len(filtered_events) / config.EVENTS_PER_PAGE)
+        if st.session_state.get('page', 1) > num_pages:
+            st.session_state['page'] = 1
+        page = 1
+        if num_pages > 1:
+            page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, step=1, key='page')
+        page_events = filtered_events[(page - 1) * config.EVENTS_PER_PAGE:page * config.EVENTS_PER_PAGE]
+        
+        # One stat per media file (cached) instead of per event on every rerun
+        paths = tuple(sorted(
+            {e.get('clip_path', '') for e in page_events} | {e.get('analyzed_frame', '') for e in page_events}
+        ))
+        exists = _existence_map(paths)
+        
+        for event in page_events:
+            display_event_card(event, metadata, exists)
+
+
+def display_event_card(event: dict, metadata: dict, exists: dict, expanded: bool = False):
+    """
+    Render one event as an expander card.
+    
+    Args:
+        event: Event dictionary from the report
+        metadata: Report metadata
+        exists: Media path -> mtime map from _existence_map
+        expanded: Whether the card starts open
+    """
+    # Create title with sampled indicator
+    sample_tag = ""
+    if 'sampling_info' in metadata:
+        sample_tag = " | 🎲 SAMPLED" if _is_sampled(event) else " | ⏭️ NOT ANALYZED"
+    
+    with st.expander(
+        f"Event #{event['event_id']}: {event.get('event_type', 'Unknown')}{sample_tag} at {event.get('timestamp_formatted', 'N/A')}",
+        expanded=expanded
+    ):
+        # Media is only loaded on request so collapsed events stay cheap
+        show_media = st.toggle(
+            "🖼️ Load frame & clip",
+            key=f"media_{event['event_id']}"
+        )
+        
+        col1, col2, col3 = st.columns([2, 1, 1])
+        
+        with col1:
+            st.write(f"**Description:** {event.get('description', 'No description available')}")
+            st.write(f"**Timestamp:** {event.get('timestamp_formatted', 'N/A')} ({event.get('timestamp', 0):.2f}s)")
+            st.write(f"**Duration:** {event.get('duration', 0):.2f} seconds")
+            st.write(f"**Frames:** {event.get('frame_count', 0)}")
+            st.write(f"**Detections:** {event.get('detection_count', 0)}")
+            
+            # Show detection method and model info
             vlm_analysis = event.get('vlm_analysis', {})
-            if vlm_analysis.get('sampled', True) == False or event.get('description', '') == 'Not analyzed (not in sample)':
-                is_sampled = False
+            detection_method = vlm_analysis.get('method', 'vlm')
             
-            # Create title with sampled indicator
-            title_parts = [f"Event #{event['event_id']}: {event.get('event_type', 'Unknown')}"]
-            if 'sampling_info' in metadata:
-                if is_sampled:
-                    title_parts.append("🎲 SAMPLED")
-                else:
-                    title_parts.append("⏭️ NOT ANALYZED")
+            if detection_method == 'yolo':
+                st.info("🤖 **Detected by:** YOLOv8 Overflow Classifier")
+                overflow_class = event.get('overflow_classification', {})
+                if overflow_class:
+                    st.write(f"   - Overflow Confidence: {overflow_class.get('confidence', 0):.2%}")
+                    st.write(f"   - Votes: {overflow_class.get('overflowing_votes', 0)}/{overflow_class.get('total_votes', 0)}")
+            elif detection_method == 'prefilter':
+                st.info("🤖 **Detected by:** YOLOv8 prefilter (no person or vehicle detected, VLM skipped)")
+            else:
+                st.info("🤖 **Detected by:** GPT-4 Vision (VLM)")
+                frames_analyzed = vlm_analysis.get('frames_analyzed', 0)
+                if frames_analyzed:
+                    st.write(f"   - Frames Analyzed: {frames_analyzed}")
             
-            with st.expander(
-                f"{' | '.join(title_parts)} at {event.get('timestamp_formatted', 'N/A')}",
-                expanded=False
-            ):
-                col1, col2, col3 = st.columns([2, 1, 1])
-                
-                with col1:
-                    st.write(f"**Description:** {event.get('description', 'No description available')}")
-                    st.write(f"**Timestamp:** {event.get('timestamp_formatted', 'N/A')} ({event.get('timestamp', 0):.2f}s)")
-                    st.write(f"**Duration:** {event.get('duration', 0):.2f} seconds")
-                    st.write(f"**Frames:** {event.get('frame_count', 0)}")
-                    st.write(f"**Detections:** {event.get('detection_count', 0)}")
-                    
-                    # Show detection method and model info
-                    vlm_analysis = event.get('vlm_analysis', {})
-                    detection_method = vlm_analysis.get('method', 'vlm')
-                    
-                    if detection_method == 'yolo':
-                        st.info("🤖 **Detected by:** YOLOv8 Overflow Classifier")
-                        overflow_class = event.get('overflow_classification', {})
-                        if overflow_class:
-                            st.write(f"   - Overflow Confidence: {overflow_class.get('confidence', 0):.2%}")
-                            st.write(f"   - Votes: {overflow_class.get('overflowing_votes', 0)}/{overflow_class.get('total_votes', 0)}")
-                    else:
-                        st.info("🤖 **Detected by:** GPT-4 Vision (VLM)")
-                        frames_analyzed = vlm_analysis.get('frames_analyzed', 0)
-                        if frames_analyzed:
-                            st.write(f"   - Frames Analyzed: {frames_analyzed}")
-                    
-                    # Show overflow classification details if available
-                    overflow_class = event.get('overflow_classification', {})
-                    if overflow_class and event.get('event_type') == 'Overflowing bin or spillage':
-                        st.markdown("---")
-                        st.subheader("Overflow Detection Details")
-                        st.write(f"**Method:** {overflow_class.get('method', 'yolo').upper()}")
-                        st.write(f"**Confidence:** {overflow_class.get('confidence', 0):.2%}")
-                        st.write(f"**Votes:** {overflow_class.get('overflowing_votes', 0)}/{overflow_class.get('total_votes', 0)} frames detected overflow")
-                
-                with col2:
-                    confidence = event.get('confidence', 'medium').lower()
-                    confidence_colors = {
-                        'high': '🟢',
-                        'medium': '🟡',
-                        'low': '🔴'
-                    }
-                    st.write(f"**Confidence:** {confidence_colors.get(confidence, '⚪')} {confidence.capitalize()}")
-                    
-                    # Show analyzed frame if available
-                    analyzed_frame = event.get('analyzed_frame', '')
-                    if analyzed_frame and os.path.exists(analyzed_frame):
-                        try:
-                            img = Image.open(analyzed_frame)
-                            st.image(img, caption="Analyzed Frame", use_container_width=True)
-                        except Exception as e:
-                            st.write(f"Could not load image: {str(e)}")
-                
-                with col3:
-                    # Clip path info
-                    clip_path = event.get('clip_path', '')
-                    if clip_path:
-                        st.write(f"**Clip:** `{os.path.basename(clip_path)}`")
-                        if not display_video(clip_path):
-                            st.warning(f"Clip file not found or could not be loaded: `{clip_path}`")
-                    else:
-                        st.info("No clip available")
-                
+            # Show overflow classification details if available
+            overflow_class = event.get('overflow_classification', {})
+            if overflow_class and event.get('event_type') == 'Overflowing bin or spillage':
                 st.markdown("---")
+                st.subheader("Overflow Detection Details")
+                st.write(f"**Method:** {overflow_class.get('method', 'yolo').upper()}")
+                st.write(f"**Confidence:** {overflow_class.get('confidence', 0):.2%}")
+                st.write(f"**Votes:** {overflow_class.get('overflowing_votes', 0)}/{overflow_class.get('total_votes', 0)} frames detected overflow")
+        
+        with col2:
+            confidence = event.get('confidence', 'medium').lower()
+            st.write(f"**Confidence:** {CONFIDENCE_GLYPHS.get(confidence, '⚪')} {confidence.capitalize()}")
+            
+            # Show analyzed frame if available
+            analyzed_frame = event.get('analyzed_frame', '')
+            frame_mtime = exists.get(analyzed_frame)
+            if show_media and frame_mtime is not None:
+                try:
+                    st.image(_thumbnail(analyzed_frame, frame_mtime), caption="Analyzed Frame", use_container_width=True)
+                except Exception as e:
+                    st.write(f"Could not load image: {str(e)}")
+        
+        with col3:
+            # Clip path info
+            clip_path = event.get('clip_path', '')
+            if clip_path:
+                st.write(f"**Clip:** `{os.path.basename(clip_path)}`")
+                if show_media and (exists.get(clip_path) is None or not display_video(clip_path)):
+                    st.warning(f"Clip file not found or could not be loaded: `{clip_path}`")
+            else:
+                st.info("No clip available")
+        
+        st.markdown("---")
 
 
 # Streamlit entry point
@@ -20,15 +20,37 @@ else:
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = "gpt-4o"  # Use gpt-4o or gpt-4-turbo for vision
 MAX_VLM_COST_USD = float(os.getenv("MAX_VLM_COST_USD", "1.0"))  # Maximum cost in USD for VLM analysis per run
+VLM_CONCURRENCY = 8  # VLM requests in flight at once when analyzing events
+VLM_MAX_RETRIES = 4  # Retries (with exponential backoff) of rate-limited, timed-out and 5xx VLM requests
+VLM_STRUCTURED_OUTPUT = True  # JSON-schema responses (gpt-4o and later); set False for gpt-4-turbo
+# Label events with no person or vehicle (COCO person/car/motorcycle/bus/truck) in any frame as
+# "Bin missed / not collected" without calling the VLM. Saves budget, but can miss other event types.
+VLM_PREFILTER = False
+VLM_MAX_IMAGE_SIDE = 1024  # Frames are downscaled to fit this before upload (larger images are billed as high detail)
 
 # Detection Configuration
 DETECTION_CONFIDENCE_THRESHOLD = 0.5
+YOLO_BATCH_SIZE = 16  # Frames per YOLO inference call
+FRAME_PREFETCH_WORKERS = 4  # Threads decoding the next batch of frames during inference
+YOLO_CPU_WORKERS = None  # Detection processes when no GPU is available (None = half the cores, at most 8)
+# Inference backend for the YOLO models: "pytorch", "onnx" (onnxruntime), "engine" (TensorRT, NVIDIA GPUs)
+# or "openvino" (Intel CPUs). Non-PyTorch backends are exported once next to the .pt weights and reused.
+YOLO_BACKEND = os.getenv("YOLO_BACKEND", "pytorch")
+YOLO_INT8_DATA = os.getenv("YOLO_INT8_DATA")  # Calibration dataset YAML for INT8 TensorRT/OpenVINO exports (None = FP16)
+DUP_SKIP_THRESHOLD = 4  # Reuse the previous detections for frames within this dHash Hamming distance (0 = off)
+# COCO class ids YOLO should return (None = all 80). Large objects of any class count as potential
+# bins, so restricting this trades recall (and the reported detection counts) for faster postprocessing.
+YOLO_CLASSES = None
 # Note: YOLO COCO doesn't have a "trash can" class, so we detect all objects
 # and let the VLM filter for actual bins
 
 # Video Processing Configuration
 FRAME_SAMPLING_RATE = 1  # Extract 1 frame per second
+FRAME_SEEK_MIN_INTERVAL = 150  # Seek to each sampled frame instead of decoding through when frames are this far apart
+FRAME_JPEG_QUALITY = 85  # JPEG quality of extracted frames (detection and the VLM work at <=1024 px)
+FRAME_MAX_SIDE = None  # Downscale extracted frames so their longest side is at most this (None = full resolution)
 CLIP_DURATION_SECONDS = 10  # Total clip duration (5s before + 5s after event)
+CLIP_FRAME_MAX_SIDE = 768  # Longest side (px) of frames extracted for clip analysis; VLM resizes to this anyway
 
 # Event Types to Detect
 EVENT_TYPES: List[str] = [
@@ -45,7 +67,15 @@ VIDEOS_DIR = os.path.join(OUTPUT_DIR, "videos")
 FRAMES_DIR = os.path.join(OUTPUT_DIR, "frames")
 CLIPS_DIR = os.path.join(OUTPUT_DIR, "clips")
 REPORTS_DIR = os.path.join(OUTPUT_DIR, "reports")
+CACHE_DIR = os.path.join(OUTPUT_DIR, "cache")
+VLM_CACHE_DIR = os.path.join(CACHE_DIR, "vlm")
+VLM_RESULT_TTL_DAYS = 30  # Cached frame analyses older than this are dropped
+VLM_FRAMES_DIR = os.path.join(CACHE_DIR, "vlm_frames")
+THUMBS_DIR = os.path.join(CACHE_DIR, "thumbs")
 
 # Streamlit Configuration
 STREAMLIT_PORT = 8501
 STREAMLIT_HOST = "localhost"
+TIMELINE_MAX_MARKERS = 500  # Above this many events the timeline groups events into time bins
+TIMELINE_BINS = 250  # Number of time bins across the video when grouping
+EVENTS_PER_PAGE = 20  # Event cards shown per page in the dashboard
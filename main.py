@@ -5,6 +5,7 @@ Main CLI entry point for YouTube Bin Detection System
 import argparse
 import sys
 import random
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import yt_dlp
 
@@ -21,7 +22,10 @@ import config
 
 
 def extract_video_id(url: str) -> str:
-    """Extract video ID from YouTube URL"""
+    """Extract video ID from YouTube URL (parsed locally when possible, otherwise via yt-dlp)"""
+    video_id = video_processor.parse_video_id(url)
+    if video_id:
+        return video_id
     try:
         with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
             info = ydl.extract_info(url, download=False)
@@ -65,6 +69,23 @@ def main():
         action='store_true',
         help='Skip VLM analysis (faster, but no event descriptions)'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-run bin detection and VLM analysis instead of reusing cached results'
+    )
+    parser.add_argument(
+        '--vlm-batch',
+        action='store_true',
+        help='Submit VLM requests through the OpenAI Batch API (half price, results can take up to 24 hours)'
+    )
+    parser.add_argument(
+        '--vlm-events-per-request',
+        type=int,
+        default=1,
+        help='Judge each event on its representative frame and send this many events per VLM request '
+             '(fewer requests, no multi-frame consensus; ignored with --vlm-batch)'
+    )
     parser.add_argument(
         '--sample-size',
         type=int,
@@ -79,6 +100,13 @@ def main():
     print("=" * 60)
     print(f"\nProcessing video: {args.url}\n")
     
+    # Load the YOLO model in the background while the video and frames are prepared
+    model_loader = ThreadPoolExecutor(max_workers=1)
+    detector_future = model_loader.submit(
+        BinDetector, confidence_threshold=args.confidence, use_cache=not args.no_cache
+    )
+    model_loader.shutdown(wait=False)
+    
     try:
         # Extract video ID for checking existing files
         video_id = extract_video_id(args.url)
@@ -107,7 +135,7 @@ def main():
         
         # Step 4: Detect bins
         print("🔍 Step 4/7: Detecting bins in frames...")
-        detector = BinDetector(confidence_threshold=args.confidence)
+        detector = detector_future.result()
         frames_with_detections = detector.detect_bins_in_frames(frames)
         frames_with_bins = detector.filter_bin_detections(frames_with_detections)
         print(f"✅ Found bins in {len(frames_with_bins)} frames\n")
@@ -127,9 +155,13 @@ def main():
             sys.exit(0)
         
         # Step 6: Extract clips (or load existing)
-        print("✂️  Step 6/7: Checking event clips...")
-        events_with_clips = segmenter.extract_clips(video_path, events)
-        print(f"✅ Ready: {len(events_with_clips)} clips\n")
+        # Classification only reads event frames, so clips are cut in the background
+        # (disk/CPU-bound) while Stage 2 waits on the VLM (network-bound)
+        print("✂️  Step 6/7: Checking event clips (in the background)...\n")
+        clip_extractor = ThreadPoolExecutor(max_workers=1)
+        clip_messages = []  # Printed once extraction is joined, not in the middle of Stage 2 output
+        clips_future = clip_extractor.submit(segmenter.extract_clips, video_path, events, log=clip_messages.append)
+        clip_extractor.shutdown(wait=False)
         
         # ============================================================
         # STAGE 2: Event Classification
@@ -139,12 +171,12 @@ def main():
         print("=" * 60 + "\n")
         
         # Determine which events to analyze with VLM
-        events_to_analyze = events_with_clips
+        events_to_analyze = events
         sample_size = args.sample_size
         
-        if sample_size and sample_size > 0 and sample_size < len(events_with_clips):
+        if sample_size and sample_size > 0 and sample_size < len(events):
             # Sample random events that have bins
-            events_with_bins = [e for e in events_with_clips if e.get('has_bin', True)]
+            events_with_bins = [e for e in events if e.get('has_bin', True)]
             if len(events_with_bins) >= sample_size:
                 print(f"🎲 Sampling {sample_size} random events from {len(events_with_bins)} events with bins...")
                 events_to_analyze = random.sample(events_with_bins, sample_size)
@@ -153,10 +185,10 @@ def main():
                 print(f"⚠️  Only {len(events_with_bins)} events have bins, analyzing all of them\n")
                 events_to_analyze = events_with_bins
         else:
-            print(f"📊 Analyzing all {len(events_with_clips)} events\n")
+            print(f"📊 Analyzing all {len(events)} events\n")
         
         # Step 7: Classify events
-        analyzed_events_full = events_with_clips.copy()  # Keep all events
+        analyzed_events_full = events  # Keep all events
         analyzed_sample = events_to_analyze.copy()  # Only analyzed subset
         
         if not args.skip_analysis:
@@ -187,43 +219,50 @@ def main():
             
             # Use VLM for events not classified as overflow
             print("   🔍 Analyzing events with GPT-4 Vision...")
-            analyzer = VLMAnalyzer(max_cost=config.MAX_VLM_COST_USD if hasattr(config, 'MAX_VLM_COST_USD') else 1.0)
+            analyzer = VLMAnalyzer(max_cost=config.MAX_VLM_COST_USD if hasattr(config, 'MAX_VLM_COST_USD') else 1.0,
+                                   batch_mode=args.vlm_batch, use_cache=not args.no_cache,
+                                   events_per_request=args.vlm_events_per_request)
             events_needing_vlm = [
                 e for e in analyzed_sample 
                 if 'vlm_analysis' not in e or e.get('vlm_analysis', {}).get('event_type') != 'Overflowing bin or spillage'
             ]
             
+            # Analyzed events by id; VLM results replace the sampled event they came from
+            analyzed_dict = {e.get('event_id'): e for e in analyzed_sample}
             if events_needing_vlm:
                 vlm_analyzed = analyzer.analyze_events(events_needing_vlm, video_info)
-                # Merge VLM results back
-                vlm_dict = {e.get('event_id'): e for e in vlm_analyzed}
-                for i, event in enumerate(analyzed_sample):
-                    event_id = event.get('event_id')
-                    if event_id in vlm_dict:
-                        analyzed_sample[i] = vlm_dict[event_id]
+                analyzed_dict.update((e.get('event_id'), e) for e in vlm_analyzed)
             
-            # Merge analyzed sample back into full list
-            analyzed_dict = {e.get('event_id'): e for e in analyzed_sample}
-            for i, event in enumerate(analyzed_events_full):
-                event_id = event.get('event_id')
-                if event_id in analyzed_dict:
-                    analyzed_events_full[i] = analyzed_dict[event_id]
-                else:
-                    # Mark unanalyzed events
-                    analyzed_events_full[i] = {
-                        **event,
-                        'vlm_analysis': {
-                            'event_type': 'No event detected',
-                            'description': 'Not analyzed (not in sample)',
-                            'confidence': 'low',
-                            'sampled': False
-                        }
-                    }
+            # Build the full list in one pass, marking events outside the sample as unanalyzed
+            not_sampled = {
+                'event_type': 'No event detected',
+                'description': 'Not analyzed (not in sample)',
+                'confidence': 'low',
+                'sampled': False
+            }
+            analyzed_events_full = [
+                analyzed_dict[e.get('event_id')] if e.get('event_id') in analyzed_dict
+                else {**e, 'vlm_analysis': dict(not_sampled)}
+                for e in events
+            ]
             
             print(f"✅ Classified {len(analyzed_sample)} events (out of {len(analyzed_events_full)} total)\n")
         else:
             print("⏭️  Skipping event classification...\n")
         
+        # A clip failure must not throw away the (paid) classification results
+        clip_error = clips_future.exception()
+        for message in clip_messages:
+            print(message)
+        if clip_error is not None:
+            print(f"⚠️  Clip extraction failed ({clip_error}); reports will have no clip paths\n")
+            clip_paths = {}
+        else:
+            events_with_clips = clips_future.result()
+            print(f"✅ Ready: {len(events_with_clips)} clips\n")
+            clip_paths = {e['event_id']: e['clip_path'] for e in events_with_clips}
+        analyzed_events_full = [{**e, 'clip_path': clip_paths.get(e['event_id'], '')} for e in analyzed_events_full]
+        
         # Generate reports
         print("📊 Generating reports...")
         report_gen = ReportGenerator()
@@ -2,41 +2,171 @@
 Object detection module using YOLOv8 to detect garbage bins specifically
 """
 import os
+import hashlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+import torch
+from pathlib import Path
 from ultralytics import YOLO
 import cv2
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, NamedTuple
 import config
 
 
+def load_yolo_model(weights: str, task: str = 'detect') -> YOLO:
+    """
+    Load a YOLO model on the configured backend (config.YOLO_BACKEND).
+    
+    For ONNX, TensorRT and OpenVINO the PyTorch weights are exported once
+    (FP16 where the backend supports it) and the export is reused on later
+    runs. TensorRT and OpenVINO exports are INT8 instead when
+    config.YOLO_INT8_DATA points at a calibration dataset. Falls back to
+    PyTorch if the export fails.
+    
+    Args:
+        weights: Path to the .pt weights (other formats are loaded as-is)
+        task: YOLO task of the model ('detect' or 'classify')
+    """
+    backend = config.YOLO_BACKEND
+    exported_paths = {
+        'onnx': Path(weights).with_suffix('.onnx'),
+        'engine': Path(weights).with_suffix('.engine'),
+        'openvino': Path(weights).with_name(f"{Path(weights).stem}_openvino_model"),
+    }
+    if backend not in exported_paths or Path(weights).suffix != '.pt':
+        return YOLO(weights)
+    
+    exported_path = exported_paths[backend]
+    if not exported_path.exists():
+        print(f"   ⚙️  Exporting {weights} to {backend} (one-time)...")
+        int8 = {'int8': True, 'data': config.YOLO_INT8_DATA} if config.YOLO_INT8_DATA else {'half': True}
+        try:
+            if backend == 'engine':
+                YOLO(weights).export(format='engine', dynamic=True, batch=config.YOLO_BATCH_SIZE, **int8)
+            elif backend == 'onnx':
+                # FP16 ONNX export needs a GPU
+                YOLO(weights).export(format='onnx', half=torch.cuda.is_available(), dynamic=True)
+            else:
+                YOLO(weights).export(format='openvino', dynamic=True, **int8)
+        except Exception as e:
+            print(f"   ⚠️  {backend} export failed ({e}), using PyTorch")
+            return YOLO(weights)
+    
+    return YOLO(str(exported_path), task=task)
+
+
+class FrameDetections(NamedTuple):
+    """
+    Detections in one frame, stored as parallel arrays (one entry per box).
+    """
+    xyxy: np.ndarray          # (N, 4) bounding boxes
+    conf: np.ndarray          # (N,) confidences
+    cls: np.ndarray           # (N,) COCO class ids
+    area: np.ndarray          # (N,) bbox areas in pixels
+    ar: np.ndarray            # (N,) aspect ratios (height / width, 0 if width is 0)
+    is_container: np.ndarray  # (N,) container-like class flags
+    
+    @property
+    def num_boxes(self) -> int:
+        return len(self.conf)
+    
+    def select(self, mask: np.ndarray) -> 'FrameDetections':
+        """Subset of the detections where mask (boolean or index array) is set."""
+        return FrameDetections(*(field[mask] for field in self))
+    
+    def to_dicts(self, names: Dict[int, str]) -> List[Dict]:
+        """
+        Per-box dictionaries, for output that needs them (e.g. JSON).
+        
+        Args:
+            names: Class id -> class name mapping (BinDetector.model.names)
+        """
+        widths = self.xyxy[:, 2] - self.xyxy[:, 0]
+        heights = self.xyxy[:, 3] - self.xyxy[:, 1]
+        return [
+            {
+                'bbox': box.tolist(),
+                'confidence': float(confidence),
+                'class_id': int(class_id),
+                'class_name': names[int(class_id)],
+                'width': float(width),
+                'height': float(height),
+                'area': float(area),
+                'aspect_ratio': float(aspect_ratio),
+                'is_container_like': bool(container)
+            }
+            for box, confidence, class_id, width, height, area, aspect_ratio, container
+            in zip(self.xyxy, self.conf, self.cls, widths, heights, self.area, self.ar, self.is_container)
+        ]
+
+
 class BinDetector:
     """Detects garbage bins in video frames using YOLOv8"""
     
-    def __init__(self, model_path: str = None, confidence_threshold: float = None):
+    def __init__(self, model_path: str = None, confidence_threshold: float = None,
+                 use_cache: bool = True):
         """
         Initialize the bin detector.
         
         Args:
             model_path: Path to custom YOLO bin detection model (None uses default YOLOv8n)
             confidence_threshold: Minimum confidence for detections (default: from config)
+            use_cache: Reuse detections cached on disk for unchanged frames
         """
         self.confidence_threshold = confidence_threshold or config.DETECTION_CONFIDENCE_THRESHOLD
+        self.model_path = model_path
+        self.cache_dir = os.path.join(config.CACHE_DIR, 'detections') if use_cache else None
         
         # Load YOLO model
         # TODO: Replace with bin-specific model from Vision_Based_Smart_Bins when available
         if model_path and os.path.exists(model_path):
-            self.model = YOLO(model_path)
+            self.model = load_yolo_model(model_path)
         else:
             # Use YOLOv8n for now - will be replaced with bin-specific model
             # For now, we'll detect all objects and filter for container-like objects
-            self.model = YOLO('yolov8n.pt')
+            self.model = load_yolo_model('yolov8n.pt')
         
         # Container-like object classes that might be bins
         # COCO classes: bottle=39, cup=41, bowl=45
         # We'll use a broader approach and filter with VLM confirmation
         self.container_classes = {39, 41, 45}  # bottle, cup, bowl
+        
+        # FP16 inference on CUDA halves the bytes moved per forward pass. Exported
+        # backends already carry their precision from export time.
+        self.half = config.YOLO_BACKEND == 'pytorch' and torch.cuda.is_available()
+    
+    def _result_detections(self, result) -> FrameDetections:
+        """
+        Convert one YOLO result into a FrameDetections of per-box arrays.
+        
+        Box tensors are copied to the CPU once per frame and the bbox
+        properties are computed for all boxes at once with NumPy.
+        """
+        boxes = result.boxes
+        return self._detections_from_arrays(
+            boxes.xyxy.cpu().numpy(),
+            boxes.conf.cpu().numpy(),
+            boxes.cls.cpu().numpy().astype(int)
+        )
     
-    def detect_in_frame(self, frame_path: str) -> List[Dict]:
+    def _detections_from_arrays(self, xyxy: np.ndarray, conf: np.ndarray,
+                                class_ids: np.ndarray) -> FrameDetections:
+        """Build a FrameDetections from raw boxes, confidences and class ids."""
+        # Calculate bbox properties for filtering
+        widths = xyxy[:, 2] - xyxy[:, 0]
+        heights = xyxy[:, 3] - xyxy[:, 1]
+        
+        return FrameDetections(
+            xyxy=xyxy,
+            conf=conf,
+            cls=class_ids,
+            area=widths * heights,
+            ar=np.where(widths > 0, heights / np.where(widths > 0, widths, 1), 0),
+            is_container=np.isin(class_ids, list(self.container_classes))
+        )
+    
+    def detect_in_frame(self, frame_path: str) -> FrameDetections:
         """
         Detect objects (potentially bins) in a single frame.
         
@@ -44,83 +174,213 @@ class BinDetector:
             frame_path: Path to the frame image
             
         Returns:
-            List of detections, each with bbox, confidence, class_id, class_name
+            FrameDetections with one entry per box (use to_dicts() for dictionaries)
         """
-        results = self.model(frame_path, conf=self.confidence_threshold)
-        
-        detections = []
+        results = self.model(frame_path, conf=self.confidence_threshold, half=self.half,
+                             classes=config.YOLO_CLASSES)
+        return self._result_detections(results[0])
+    
+    def _frame_with_bins(self, frame_info: Dict, detections: FrameDetections) -> Dict:
+        """Attach detections and the potential-bin subset to a frame dictionary."""
+        # Filter for potential bins
+        # Criteria: container-like objects OR large objects with a reasonable bin aspect ratio
+        # (bins are usually big)
+        mask = detections.is_container | (
+            (detections.area > 5000) & (detections.ar > 0.8) & (detections.ar < 2.0)
+        )
+        potential_bins = detections.select(mask)
         
-        for result in results:
-            boxes = result.boxes
-            for i, box in enumerate(boxes):
-                # Get bounding box coordinates
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                confidence = float(box.conf[0].cpu().numpy())
-                class_id = int(box.cls[0].cpu().numpy())
-                class_name = self.model.names[class_id]
-                
-                # Calculate bbox properties for filtering
-                width = x2 - x1
-                height = y2 - y1
-                area = width * height
-                aspect_ratio = height / width if width > 0 else 0
-                
-                detections.append({
-                    'bbox': [float(x1), float(y1), float(x2), float(y2)],
-                    'confidence': confidence,
-                    'class_id': class_id,
-                    'class_name': class_name,
-                    'width': float(width),
-                    'height': float(height),
-                    'area': float(area),
-                    'aspect_ratio': float(aspect_ratio),
-                    'is_container_like': class_id in self.container_classes
-                })
-        
-        return detections
-    
-    def detect_bins_in_frames(self, frame_paths: List[Dict]) -> List[Dict]:
+        return {
+            **frame_info,
+            'detections': detections,
+            'bin_detections': potential_bins,
+            'has_bin': potential_bins.num_boxes > 0,
+            'detection_count': detections.num_boxes,
+            'bin_count': potential_bins.num_boxes
+        }
+    
+    @staticmethod
+    def _read_frame(path: str):
+        """Decode a frame image, or return the path for YOLO to report if it can't be read."""
+        image = cv2.imread(path)
+        return path if image is None else image
+    
+    def detect_bins_in_frames(self, frame_paths: List[Dict], batch_size: int = None) -> List[Dict]:
         """
         Detect bins in multiple frames.
         Uses container-like object detection and filters by size/position.
         
+        Frames are sent to YOLO in batches so preprocessing, inference and
+        NMS are amortized across frames instead of paid per image. While a
+        batch runs, a thread pool decodes the next one from disk, so at most
+        two batches of images are held in memory. Without a GPU, batches are
+        spread over a pool of worker processes (config.YOLO_CPU_WORKERS).
+        Detections are cached on disk per frame, so unchanged frames skip
+        YOLO on later runs, and near-duplicate consecutive frames (by dHash)
+        reuse the previous frame's detections.
+        
         Args:
             frame_paths: List of frame dictionaries with 'path', 'timestamp', etc.
+            batch_size: Frames per YOLO call (default: from config)
             
         Returns:
             List of frames with bin detections, including frame metadata and detected bins
         """
+        batch_size = batch_size or config.YOLO_BATCH_SIZE
+        
+        results = [None] * len(frame_paths)
+        cache_paths = [None] * len(frame_paths)
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for i, frame_info in enumerate(frame_paths):
+                cache_paths[i] = self._cache_path(frame_info['path'])
+                detections = self._load_cached(cache_paths[i])
+                if detections is not None:
+                    results[i] = self._frame_with_bins(frame_info, detections)
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if self.cache_dir is not None and len(missing) < len(frame_paths):
+            print(f"   📁 Loaded detections for {len(frame_paths) - len(missing)} frames from cache")
+        to_detect = [frame_paths[i] for i in missing]
+        
+        # Near-duplicate frames reuse the detections of the last frame that ran through YOLO
+        sources = self._duplicate_sources(to_detect)
+        unique = sorted(set(sources))
+        if len(unique) < len(to_detect):
+            print(f"   ⏭️  Skipping YOLO for {len(to_detect) - len(unique)} near-duplicate frames")
+        unique_frames = [to_detect[j] for j in unique]
+        
+        workers = self._cpu_workers()
+        if workers > 1 and len(unique_frames) > batch_size:
+            detected = self._detect_in_worker_pool(unique_frames, batch_size, workers)
+        else:
+            detected = self._detect_in_batches(unique_frames, batch_size)
+        detected = dict(zip(unique, detected))
+        
+        for j, i in enumerate(missing):
+            frame = detected[sources[j]]
+            if sources[j] != j:
+                frame = self._frame_with_bins(frame_paths[i], frame['detections'])
+            results[i] = frame
+            if cache_paths[i] is not None:
+                self._save_cached(cache_paths[i], frame['detections'])
+        
+        return results
+    
+    @staticmethod
+    def _frame_hash(path: str):
+        """64-bit difference hash (dHash) of a frame, or None if it can't be read."""
+        image = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if image is None:
+            return None
+        small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+        return int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), 'big')
+    
+    def _duplicate_sources(self, frame_paths: List[Dict]) -> List[int]:
+        """
+        For each frame, the index of the frame whose detections it should use:
+        itself, or the last frame sent to YOLO if their dHashes differ in fewer
+        than config.DUP_SKIP_THRESHOLD bits.
+        """
+        threshold = config.DUP_SKIP_THRESHOLD
+        if not threshold:
+            return list(range(len(frame_paths)))
+        
+        with ThreadPoolExecutor(max_workers=config.FRAME_PREFETCH_WORKERS) as pool:
+            hashes = list(pool.map(self._frame_hash, [frame_info['path'] for frame_info in frame_paths]))
+        
+        sources = []
+        last_index, last_hash = None, None
+        for i, frame_hash in enumerate(hashes):
+            if (frame_hash is not None and last_hash is not None
+                    and bin(frame_hash ^ last_hash).count('1') < threshold):
+                sources.append(last_index)
+            else:
+                sources.append(i)
+                last_index, last_hash = i, frame_hash
+        return sources
+    
+    def _cache_path(self, frame_path: str) -> str:
+        """Detection cache file for a frame, keyed by path, mtime and every detection setting."""
+        key = hashlib.blake2b(
+            f"{os.path.abspath(frame_path)}|{os.path.getmtime(frame_path)}|"
+            f"{self.model_path or 'yolov8n.pt'}|{config.YOLO_BACKEND}|{self.half}|"
+            f"{self.confidence_threshold}|{config.DUP_SKIP_THRESHOLD}|{config.YOLO_CLASSES}".encode(),
+            digest_size=16
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.npz")
+    
+    def _load_cached(self, cache_path: str):
+        """Cached FrameDetections, or None if missing or unreadable."""
+        try:
+            with np.load(cache_path) as data:
+                return self._detections_from_arrays(data['xyxy'], data['conf'], data['cls'])
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    @staticmethod
+    def _save_cached(cache_path: str, detections: FrameDetections):
+        """Write raw detections for a frame (atomically, so readers never see a partial file)."""
+        tmp_path = cache_path + '.part'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, xyxy=detections.xyxy, conf=detections.conf, cls=detections.cls)
+        os.replace(tmp_path, cache_path)
+    
+    def _detect_in_batches(self, frame_paths: List[Dict], batch_size: int) -> List[Dict]:
+        """Run batched detection in this process, decoding the next batch while one runs."""
+        batches = [frame_paths[start:start + batch_size]
+                   for start in range(0, len(frame_paths), batch_size)]
         results = []
         
-        for frame_info in frame_paths:
-            frame_path = frame_info['path']
-            detections = self.detect_in_frame(frame_path)
+        with ThreadPoolExecutor(max_workers=config.FRAME_PREFETCH_WORKERS) as pool:
+            def prefetch(batch):
+                return [pool.submit(self._read_frame, frame_info['path']) for frame_info in batch]
             
-            # Filter for potential bins
-            # Criteria: container-like objects OR large objects that might be bins
-            potential_bins = []
-            for det in detections:
-                # Filter for container-like objects or large objects
-                is_large_object = det['area'] > 5000  # Threshold for large objects (bins are usually big)
-                is_container = det['is_container_like']
-                is_tall_object = det['aspect_ratio'] > 0.8 and det['aspect_ratio'] < 2.0  # Reasonable bin aspect ratio
+            pending = prefetch(batches[0]) if batches else []
+            for index, batch in enumerate(batches):
+                images = [future.result() for future in pending]
+                if index + 1 < len(batches):
+                    pending = prefetch(batches[index + 1])
                 
-                if is_container or (is_large_object and is_tall_object):
-                    potential_bins.append(det)
-            
-            has_bin = len(potential_bins) > 0
-            
-            results.append({
-                **frame_info,
-                'detections': detections,
-                'bin_detections': potential_bins,
-                'has_bin': has_bin,
-                'detection_count': len(detections),
-                'bin_count': len(potential_bins)
-            })
+                batch_results = self.model(
+                    images,
+                    conf=self.confidence_threshold,
+                    half=self.half,
+                    classes=config.YOLO_CLASSES,
+                    stream=True,
+                    verbose=False
+                )
+                # Results come back in input order, one per frame
+                for frame_info, result in zip(batch, batch_results):
+                    results.append(self._frame_with_bins(frame_info, self._result_detections(result)))
         
         return results
     
+    @staticmethod
+    def _cpu_workers() -> int:
+        """Number of detection processes to use (1 when a GPU is available)."""
+        if torch.cuda.is_available():
+            return 1
+        if config.YOLO_CPU_WORKERS is not None:
+            return config.YOLO_CPU_WORKERS
+        return min((os.cpu_count() or 1) // 2, 8)
+    
+    def _detect_in_worker_pool(self, frame_paths: List[Dict], batch_size: int, workers: int) -> List[Dict]:
+        """
+        Run detection on CPU across a pool of processes, one YOLO model each.
+        
+        Frames are split into shards of batch_size; each worker runs the usual
+        batched detection on its shards. Workers are started with 'spawn' so
+        no model or thread state is inherited by fork.
+        """
+        shards = [frame_paths[start:start + batch_size]
+                  for start in range(0, len(frame_paths), batch_size)]
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(workers, initializer=_init_worker,
+                          initargs=(self.model_path, self.confidence_threshold, workers)) as pool:
+            # imap keeps shard order, so frames come back in input order
+            return [frame for shard in pool.imap(_detect_shard, shards) for frame in shard]
+    
     def filter_bin_detections(self, frames_with_detections: List[Dict]) -> List[Dict]:
         """
         Filter frames to only those that likely contain bins.
@@ -134,6 +394,23 @@ class BinDetector:
         return [f for f in frames_with_detections if f['has_bin']]
 
 
+# Per-process detector used by BinDetector._detect_in_worker_pool
+_worker_detector = None
+
+
+def _init_worker(model_path: str, confidence_threshold: float, workers: int):
+    """Load one YOLO model per worker process."""
+    global _worker_detector
+    # Split the cores between workers instead of every worker using all of them
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    _worker_detector = BinDetector(model_path, confidence_threshold)
+
+
+def _detect_shard(frame_paths: List[Dict]) -> List[Dict]:
+    """Detect bins in one shard of frames inside a worker process."""
+    return _worker_detector._detect_in_batches(frame_paths, len(frame_paths))
+
+
 def format_timestamp(seconds: float) -> str:
     """
     Format seconds as HH:MM:SS.
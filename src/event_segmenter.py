@@ -2,12 +2,52 @@
 Event segmentation module to cluster detections and extract video clips
 """
 import os
+import functools
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import cv2
-from typing import List, Dict
+import numpy as np
+from typing import Callable, List, Dict, Tuple
 from pathlib import Path
 import config
 
 
+# Clips cut per ffmpeg process (each clip is one input, so this bounds open files)
+FFMPEG_CLIPS_PER_RUN = 32
+
+
+@functools.lru_cache(maxsize=8)
+def _probe_video(video_path: str, mtime: float) -> Tuple[float, int, int]:
+    """
+    Read (fps, width, height) of a video, cached per (path, mtime) so
+    repeated extract_clips calls don't reopen the file.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    return video_fps, width, height
+
+
+def _open_capture(video_path: str) -> cv2.VideoCapture:
+    """
+    Open a video for decoding, asking OpenCV's FFmpeg backend for hardware
+    decoding (NVDEC, VAAPI, VideoToolbox...) where the build supports it.
+    OpenCV falls back to its multithreaded software decoder otherwise.
+    """
+    if hasattr(cv2, 'VIDEO_ACCELERATION_ANY'):
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG,
+                               [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if cap.isOpened():
+            return cap
+    return cv2.VideoCapture(video_path)
+
+
 class EventSegmenter:
     """Segments video into events and extracts clips"""
     
@@ -27,63 +67,55 @@ class EventSegmenter:
         """
         Cluster consecutive detections into discrete events.
         
+        Frames with bins are grouped wherever the gap between consecutive
+        bin timestamps exceeds gap_threshold. Boundaries and per-event
+        start/end/detection totals are computed with NumPy in one pass.
+        
         Args:
-            frames_with_detections: List of frames with detection results
+            frames_with_detections: List of frames with detection results (in time order)
             
         Returns:
             List of event clusters, each containing frame info and timestamps
         """
-        if not frames_with_detections:
+        frames = frames_with_detections
+        has_bin = np.fromiter((f.get('has_bin', False) for f in frames), dtype=bool, count=len(frames))
+        bin_indices = np.flatnonzero(has_bin)
+        if not bin_indices.size:
             return []
         
-        events = []
-        current_event = []
-        event_id_counter = 1
-        
-        for i, frame in enumerate(frames_with_detections):
-            if not frame.get('has_bin', False):
-                # End current event if gap is too large
-                if current_event:
-                    # Check gap from last frame in current event
-                    last_timestamp = current_event[-1]['timestamp']
-                    current_timestamp = frame['timestamp']
-                    if current_timestamp - last_timestamp > self.gap_threshold:
-                        # Save event and start new one
-                        events.append(self._create_event(current_event, event_id_counter))
-                        event_id_counter += 1
-                        current_event = []
-                continue
-            
-            # Check if this frame continues current event or starts new one
-            if current_event:
-                last_timestamp = current_event[-1]['timestamp']
-                current_timestamp = frame['timestamp']
-                
-                if current_timestamp - last_timestamp <= self.gap_threshold:
-                    # Continue current event
-                    current_event.append(frame)
-                else:
-                    # Gap too large, start new event
-                    events.append(self._create_event(current_event, event_id_counter))
-                    event_id_counter += 1
-                    current_event = [frame]
-            else:
-                # Start new event
-                current_event = [frame]
+        bin_frames = [frames[i] for i in bin_indices]
+        timestamps = np.fromiter((f['timestamp'] for f in bin_frames), dtype=np.float64,
+                                 count=len(bin_frames))
+        detection_counts = np.fromiter((f['detection_count'] for f in bin_frames), dtype=np.int64,
+                                       count=len(bin_frames))
         
-        # Don't forget the last event
-        if current_event:
-            events.append(self._create_event(current_event, event_id_counter))
+        # Index of the first frame of each event: a new event starts after every gap that's too large
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(timestamps) > self.gap_threshold) + 1))
+        ends = np.append(starts[1:], len(bin_frames))
+        start_times = np.minimum.reduceat(timestamps, starts)
+        end_times = np.maximum.reduceat(timestamps, starts)
+        detections = np.add.reduceat(detection_counts, starts)
         
-        return events
+        return [
+            self._create_event(
+                bin_frames[start:end], event_index + 1,
+                float(start_times[event_index]), float(end_times[event_index]),
+                int(detections[event_index])
+            )
+            for event_index, (start, end) in enumerate(zip(starts, ends))
+        ]
     
-    def _create_event(self, frames: List[Dict], event_id: int) -> Dict:
+    def _create_event(self, frames: List[Dict], event_id: int, start_time: float,
+                      end_time: float, detections: int) -> Dict:
         """
         Create an event dictionary from a list of frames.
         
         Args:
             frames: List of frames belonging to the event
             event_id: Unique identifier for this event
+            start_time: Earliest frame timestamp in the event
+            end_time: Latest frame timestamp in the event
+            detections: Total detections across the event's frames
             
         Returns:
             Event dictionary with metadata
@@ -91,9 +123,6 @@ class EventSegmenter:
         if not frames:
             return None
         
-        timestamps = [f['timestamp'] for f in frames]
-        start_time = min(timestamps)
-        end_time = max(timestamps)
         center_time = (start_time + end_time) / 2
         
         # Get representative frame (middle frame)
@@ -109,10 +138,11 @@ class EventSegmenter:
             'duration': end_time - start_time,
             'frame_count': len(frames),
             'representative_frame': representative_frame,
-            'detections': sum(f['detection_count'] for f in frames)
+            'detections': detections
         }
     
-    def extract_clips(self, video_path: str, events: List[Dict], output_dir: str = None) -> List[Dict]:
+    def extract_clips(self, video_path: str, events: List[Dict], output_dir: str = None,
+                      log: Callable[[str], None] = print) -> List[Dict]:
         """
         Extract video clips around each event.
         Checks if clips already exist and skips extraction if found.
@@ -121,6 +151,7 @@ class EventSegmenter:
             video_path: Path to the source video
             events: List of event dictionaries
             output_dir: Directory to save clips (default: outputs/clips)
+            log: Receives the progress messages (default: print)
             
         Returns:
             List of events with added clip_path information
@@ -135,18 +166,11 @@ class EventSegmenter:
         os.makedirs(clip_dir, exist_ok=True)
         
         # Get video properties first
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Could not open video: {video_path}")
-        
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        cap.release()
+        video_fps, width, height = _probe_video(video_path, os.path.getmtime(video_path))
         
         events_with_clips = []
         clips_loaded = 0
-        clips_extracted = 0
+        pending = []  # (event_with_clip, start_frame, end_frame) for clips still to extract
         
         for event_idx, event in enumerate(events):
             # Get event_id, defaulting to index+1 if not present (backwards compatibility)
@@ -157,46 +181,97 @@ class EventSegmenter:
             clip_filename = f"event_{event_id:03d}_t{center_time:.2f}s.mp4"
             clip_path = os.path.join(clip_dir, clip_filename)
             
+            event_with_clip = {
+                **event,
+                'event_id': event_id,  # Explicitly preserve event_id
+                'clip_path': clip_path
+            }
+            events_with_clips.append(event_with_clip)
+            
             # Check if clip already exists
             if os.path.exists(clip_path):
-                # Clip exists, just add the path and ensure event_id is preserved
-                event_with_clip = {
-                    **event,
-                    'event_id': event_id,  # Explicitly preserve event_id
-                    'clip_path': clip_path
-                }
                 clips_loaded += 1
             else:
-                # Clip doesn't exist, extract it
+                # Clip doesn't exist, extract it below
                 center_frame = int(center_time * video_fps)
                 clip_duration_frames = int(config.CLIP_DURATION_SECONDS * video_fps)
                 clip_start_frame = max(0, center_frame - clip_duration_frames // 2)
                 clip_end_frame = center_frame + clip_duration_frames // 2
-                
-                self._extract_clip_opencv(
-                    video_path, video_fps, width, height, clip_start_frame, clip_end_frame, clip_path
-                )
-                
-                event_with_clip = {
-                    **event,
-                    'event_id': event_id,  # Explicitly preserve event_id
-                    'clip_path': clip_path
-                }
-                clips_extracted += 1
-            
-            events_with_clips.append(event_with_clip)
+                pending.append((event_with_clip, clip_start_frame, clip_end_frame))
+        
+        if pending:
+            clips = [
+                (start_frame / video_fps, (end_frame - start_frame + 1) / video_fps, event['clip_path'])
+                for event, start_frame, end_frame in pending
+            ]
+            if not self._extract_clips_ffmpeg(video_path, clips):
+                # Each clip has its own VideoCapture/VideoWriter and OpenCV releases
+                # the GIL while decoding and encoding, so clips extract in parallel
+                with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+                    futures = [
+                        pool.submit(self._extract_clip_opencv, video_path, video_fps, width, height,
+                                    start_frame, end_frame, event['clip_path'])
+                        for event, start_frame, end_frame in pending
+                        # Skip clips written by an ffmpeg run that succeeded before the failure
+                        if not os.path.exists(event['clip_path'])
+                    ]
+                    for future in as_completed(futures):
+                        future.result()  # re-raise extraction errors
         
         if clips_loaded > 0:
-            print(f"   📁 Loaded {clips_loaded} existing clips from cache")
-        if clips_extracted > 0:
-            print(f"   ✂️  Extracted {clips_extracted} new clips")
+            log(f"   📁 Loaded {clips_loaded} existing clips from cache")
+        if pending:
+            log(f"   ✂️  Extracted {len(pending)} new clips")
         
         return events_with_clips
     
+    def _extract_clips_ffmpeg(self, video_path: str, clips: List[Tuple[float, float, str]]) -> bool:
+        """
+        Extract clips with ffmpeg by stream copy (no decode/re-encode).
+        
+        All clips are cut by a single ffmpeg process: each clip is its own
+        input (seeking before the input jumps straight to the nearest
+        keyframe, so a clip may start slightly before its start time) mapped
+        to its own output. Clips may overlap, which rules out the segment
+        muxer. Clips are processed in groups of FFMPEG_CLIPS_PER_RUN to
+        bound the number of open inputs.
+        
+        Args:
+            video_path: Path to source video
+            clips: List of (start_sec, duration_sec, output_path)
+            
+        Returns:
+            True if every clip was written, False if ffmpeg is unavailable or fails
+        """
+        if shutil.which('ffmpeg') is None:
+            return False
+        
+        for group_start in range(0, len(clips), FFMPEG_CLIPS_PER_RUN):
+            group = clips[group_start:group_start + FFMPEG_CLIPS_PER_RUN]
+            inputs, outputs = [], []
+            for i, (start_sec, duration_sec, output_path) in enumerate(group):
+                inputs += ['-ss', f"{start_sec:.3f}", '-t', f"{duration_sec:.3f}", '-i', video_path]
+                # Write to a temporary file so a failed run never leaves a partial
+                # clip that later runs would treat as cached
+                outputs += ['-map', f"{i}:v:0", '-map', f"{i}:a:0?", '-c', 'copy',
+                            '-avoid_negative_ts', '1', '-f', 'mp4', output_path + '.part']
+            
+            try:
+                subprocess.run(['ffmpeg', '-y', '-v', 'error', *inputs, *outputs], check=True)
+                for _, _, output_path in group:
+                    os.replace(output_path + '.part', output_path)
+            except (subprocess.CalledProcessError, OSError):
+                for _, _, output_path in group:
+                    if os.path.exists(output_path + '.part'):
+                        os.remove(output_path + '.part')
+                return False
+        
+        return True
+    
     def _extract_clip_opencv(self, video_path: str, fps: float, width: int, height: int,
                              start_frame: int, end_frame: int, output_path: str):
         """
-        Extract a clip from video using OpenCV.
+        Extract a clip from video using OpenCV (fallback when ffmpeg is unavailable).
         
         Args:
             video_path: Path to source video
@@ -207,7 +282,7 @@ class EventSegmenter:
             end_frame: Ending frame number
             output_path: Path to save the clip
         """
-        cap = cv2.VideoCapture(video_path)
+        cap = _open_capture(video_path)
         if not cap.isOpened():
             raise ValueError(f"Could not open video: {video_path}")
         
@@ -218,14 +293,14 @@ class EventSegmenter:
         # Seek to start frame
         cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
         
-        # Read and write frames
-        current_frame = start_frame
-        while current_frame <= end_frame:
-            ret, frame = cap.read()
+        # Read and write frames, decoding each into the same buffer instead of
+        # allocating a new array per frame
+        frame = None
+        for _ in range(end_frame - start_frame + 1):
+            ret, frame = cap.read(frame)
             if not ret:
                 break
             out.write(frame)
-            current_frame += 1
         
         out.release()
         cap.release()
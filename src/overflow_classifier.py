@@ -2,9 +2,19 @@
 Overflow classification module using YOLOv8 to detect overflowing bins
 """
 import os
-from ultralytics import YOLO
+import functools
 from typing import Dict, Optional, List
+import cv2
+import numpy as np
+import torch
 import config
+from .bin_detector import load_yolo_model
+
+
+@functools.lru_cache(maxsize=4)
+def _get_model(model_path: str):
+    """Load a classification model once and share it across OverflowClassifier instances"""
+    return load_yolo_model(model_path, task='classify')
 
 
 class OverflowClassifier:
@@ -24,12 +34,19 @@ class OverflowClassifier:
         # Try to load model if path provided
         if model_path and os.path.exists(model_path):
             try:
-                self.model = YOLO(model_path)
+                self.model = _get_model(model_path)
             except Exception as e:
                 print(f"Warning: Could not load overflow classification model from {model_path}: {e}")
         
         # If no model loaded, we'll use VLM for overflow detection instead
         self.has_model = self.model is not None
+        
+        # FP16 with NHWC (channels_last) weights lets cuDNN use its Tensor Core
+        # convolution kernels; exported backends manage their own layout
+        self.half = (self.has_model and torch.cuda.is_available()
+                     and isinstance(self.model.model, torch.nn.Module))
+        if self.half:
+            self.model.model.to(memory_format=torch.channels_last)
     
     def classify_frame(self, frame_path: str) -> Dict:
         """
@@ -55,34 +72,9 @@ class OverflowClassifier:
             }
         
         try:
-            results = self.model(frame_path)
-            
-            # YOLOv8 classification returns class probabilities
-            # Assuming model has 2 classes: 'not_full' (0) and 'full' (1)
-            if results and len(results) > 0:
-                probs = results[0].probs
-                if probs is not None:
-                    # Get probability for 'full' class (class 1)
-                    full_prob = float(probs.data[1] if len(probs.data) > 1 else 0.0)
-                    not_full_prob = float(probs.data[0] if len(probs.data) > 0 else 0.0)
-                    
-                    is_overflowing = full_prob > 0.5
-                    confidence = max(full_prob, not_full_prob)
-                    
-                    return {
-                        'is_overflowing': is_overflowing,
-                        'confidence': confidence,
-                        'full_probability': full_prob,
-                        'not_full_probability': not_full_prob,
-                        'method': 'yolo'
-                    }
-            
-            return {
-                'is_overflowing': False,
-                'confidence': 0.0,
-                'method': 'yolo',
-                'message': 'No classification results'
-            }
+            with torch.inference_mode():
+                results = self.model(frame_path, half=self.half)
+            return self._result_classification(results[0] if results else None)
         
         except Exception as e:
             return {
@@ -92,6 +84,47 @@ class OverflowClassifier:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _read_frames(frame_paths: List[str]) -> Optional[List[np.ndarray]]:
+        """
+        Decode frames into BGR arrays for one batched predictor call (the
+        predictor applies the classify transforms itself). Returns None if a
+        frame can't be read.
+        """
+        images = [cv2.imread(frame_path) for frame_path in frame_paths]
+        if any(image is None for image in images):
+            return None
+        return images
+    
+    @staticmethod
+    def _result_classification(result) -> Dict:
+        """Turn one YOLO classification result into a classification dictionary."""
+        # YOLOv8 classification returns class probabilities
+        # Assuming model has 2 classes: 'not_full' (0) and 'full' (1)
+        probs = result.probs if result is not None else None
+        if probs is not None:
+            # Get probability for 'full' class (class 1)
+            full_prob = float(probs.data[1] if len(probs.data) > 1 else 0.0)
+            not_full_prob = float(probs.data[0] if len(probs.data) > 0 else 0.0)
+            
+            is_overflowing = full_prob > 0.5
+            confidence = max(full_prob, not_full_prob)
+            
+            return {
+                'is_overflowing': is_overflowing,
+                'confidence': confidence,
+                'full_probability': full_prob,
+                'not_full_probability': not_full_prob,
+                'method': 'yolo'
+            }
+        
+        return {
+            'is_overflowing': False,
+            'confidence': 0.0,
+            'method': 'yolo',
+            'message': 'No classification results'
+        }
+    
     def classify_clip_frames(self, frame_paths: List[str], sample_count: int = 3) -> Dict:
         """
         Classify multiple frames from a clip and return consensus.
@@ -119,12 +152,26 @@ class OverflowClassifier:
         
         sample_frames = [frame_paths[i] for i in sample_indices if i < len(frame_paths)]
         
-        classifications = []
-        for frame_path in sample_frames:
-            if os.path.exists(frame_path):
-                result = self.classify_frame(frame_path)
-                if result.get('method') == 'yolo' and 'error' not in result:
-                    classifications.append(result)
+        sample_frames = [frame_path for frame_path in sample_frames if os.path.exists(frame_path)]
+        
+        if not self.has_model or not sample_frames:
+            results = []
+        else:
+            try:
+                # One batched call for all sampled frames instead of one call per frame
+                images = self._read_frames(sample_frames)
+                with torch.inference_mode():
+                    predictions = self.model(images if images is not None else sample_frames,
+                                             half=self.half, verbose=False)
+                results = [self._result_classification(result) for result in predictions]
+            except Exception:
+                # Classify frames one at a time so a single bad frame doesn't sink the clip
+                results = [self.classify_frame(frame_path) for frame_path in sample_frames]
+        
+        classifications = [
+            result for result in results
+            if result.get('method') == 'yolo' and 'error' not in result
+        ]
         
         if not classifications:
             return {
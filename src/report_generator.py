@@ -2,18 +2,38 @@
 Report generation module for JSON and markdown outputs
 """
 import os
+import io
 import json
+import math
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 from datetime import datetime
 import config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def format_timestamp(seconds: float) -> str:
     """Format seconds as HH:MM:SS"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    return _format_whole_seconds(math.floor(seconds))
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_whole_seconds(seconds: int) -> str:
+    """HH:MM:SS for a whole number of seconds (cached: reports repeat the same times)"""
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _write_atomic(output_path: str, data) -> None:
+    """Write bytes to a temporary file and rename it into place, so a crash never leaves a partial report"""
+    tmp_path = output_path + '.part'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, output_path)
 
 
 class ReportGenerator:
@@ -70,31 +90,35 @@ class ReportGenerator:
         if 'sampling_info' in video_info:
             report['metadata']['sampling_info'] = video_info['sampling_info']
         
-        # Add events
+        # Add events (dict lookups bound once per event)
         for event in events:
-            vlm_analysis = event.get('vlm_analysis', {})
+            ev = event.get
+            vlm = ev('vlm_analysis', {}).get
+            center_time = ev('center_time', 0)
+            start_time = ev('start_time', 0)
+            end_time = ev('end_time', 0)
             
             event_data = {
-                'event_id': event.get('event_id', 0),
-                'timestamp': event.get('center_time', 0),
-                'timestamp_formatted': format_timestamp(event.get('center_time', 0)),
-                'start_time': event.get('start_time', 0),
-                'start_time_formatted': format_timestamp(event.get('start_time', 0)),
-                'end_time': event.get('end_time', 0),
-                'end_time_formatted': format_timestamp(event.get('end_time', 0)),
-                'duration': event.get('duration', 0),
-                'frame_count': event.get('frame_count', 0),
-                'detection_count': event.get('detections', 0),
-                'event_type': vlm_analysis.get('event_type', 'No event detected'),
-                'description': vlm_analysis.get('description', ''),
-                'confidence': vlm_analysis.get('confidence', 'medium'),
-                'detection_method': vlm_analysis.get('method', 'vlm'),  # Add this
-                'clip_path': event.get('clip_path', ''),
-                'analyzed_frame': event.get('analyzed_frame', '')
+                'event_id': ev('event_id', 0),
+                'timestamp': center_time,
+                'timestamp_formatted': format_timestamp(center_time),
+                'start_time': start_time,
+                'start_time_formatted': format_timestamp(start_time),
+                'end_time': end_time,
+                'end_time_formatted': format_timestamp(end_time),
+                'duration': ev('duration', 0),
+                'frame_count': ev('frame_count', 0),
+                'detection_count': ev('detections', 0),
+                'event_type': vlm('event_type', 'No event detected'),
+                'description': vlm('description', ''),
+                'confidence': vlm('confidence', 'medium'),
+                'detection_method': vlm('method', 'vlm'),  # Add this
+                'clip_path': ev('clip_path', ''),
+                'analyzed_frame': ev('analyzed_frame', '')
             }
             
             # Add overflow classification details if available
-            overflow_class = event.get('overflow_classification', {})
+            overflow_class = ev('overflow_classification', {})
             if overflow_class:
                 event_data['overflow_detection'] = {
                     'method': overflow_class.get('method', 'yolo'),
@@ -106,8 +130,11 @@ class ReportGenerator:
             report['events'].append(event_data)
         
         # Write JSON file
-        with open(output_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            data = json.dumps(report, indent=2).encode('utf-8')
+        _write_atomic(output_path, data)
         
         return output_path
     
@@ -131,81 +158,77 @@ class ReportGenerator:
         
         output_path = os.path.join(self.output_dir, output_filename)
         
-        # Build markdown content
-        lines = [
-            "# Garbage Bin Event Detection Report",
-            "",
-            f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "",
-            "## Video Information",
-            "",
-            f"- **URL:** {video_url}",
-            f"- **Duration:** {format_timestamp(video_info.get('duration', 0))}",
-            f"- **Resolution:** {video_info.get('width', 0)}x{video_info.get('height', 0)}",
-            f"- **FPS:** {video_info.get('fps', 0):.2f}",
-            f"- **Total Events Detected:** {len(events)}",
-            "",
-            "---",
-            ""
-        ]
+        # Build markdown content: every block ends with a blank line
+        buf = io.StringIO()
+        buf.write(
+            f"# Garbage Bin Event Detection Report\n"
+            f"\n"
+            f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"\n"
+            f"## Video Information\n"
+            f"\n"
+            f"- **URL:** {video_url}\n"
+            f"- **Duration:** {format_timestamp(video_info.get('duration', 0))}\n"
+            f"- **Resolution:** {video_info.get('width', 0)}x{video_info.get('height', 0)}\n"
+            f"- **FPS:** {video_info.get('fps', 0):.2f}\n"
+            f"- **Total Events Detected:** {len(events)}\n"
+            f"\n"
+            f"---\n"
+            f"\n"
+        )
         
         # Add sampling info if present
         if 'sampling_info' in video_info:
             sampling_info = video_info['sampling_info']
-            lines.extend([
-                "## Sampling Information",
-                "",
-                f"- **Total Events:** {sampling_info.get('total_events', len(events))}",
-                f"- **Events Analyzed with VLM:** {sampling_info.get('sampled_events', len(events))}",
-                f"- **Sample Size:** {sampling_info.get('sample_size', 'N/A')}",
-                f"- **Sampling Method:** {sampling_info.get('sampling_method', 'N/A')}",
-                "",
-                "---",
-                ""
-            ])
-        
-        lines.extend([
-            "## Events Detected",
-            ""
-        ])
+            buf.write(
+                f"## Sampling Information\n"
+                f"\n"
+                f"- **Total Events:** {sampling_info.get('total_events', len(events))}\n"
+                f"- **Events Analyzed with VLM:** {sampling_info.get('sampled_events', len(events))}\n"
+                f"- **Sample Size:** {sampling_info.get('sample_size', 'N/A')}\n"
+                f"- **Sampling Method:** {sampling_info.get('sampling_method', 'N/A')}\n"
+                f"\n"
+                f"---\n"
+                f"\n"
+            )
+        
+        buf.write("## Events Detected\n\n")
         
         if not events:
-            lines.extend([
-                "No events detected in this video.",
-                ""
-            ])
+            buf.write("No events detected in this video.\n\n")
         else:
             for event in events:
                 vlm_analysis = event.get('vlm_analysis', {})
                 event_id = event.get('event_id', 0)
-                timestamp = format_timestamp(event.get('center_time', 0))
+                center_time = event.get('center_time', 0)
                 event_type = vlm_analysis.get('event_type', 'No event detected')
                 description = vlm_analysis.get('description', 'No description available')
                 confidence = vlm_analysis.get('confidence', 'medium')
                 
-                lines.extend([
-                    f"### Event #{event_id} - {event_type}",
-                    "",
-                    f"**Timestamp:** {timestamp} ({event.get('center_time', 0):.2f}s)",
-                    f"**Duration:** {event.get('duration', 0):.2f} seconds",
-                    f"**Confidence:** {confidence.capitalize()}",
-                    f"**Frames with Detections:** {event.get('frame_count', 0)}",
-                    "",
-                    f"**Description:**",
-                    f"{description}",
-                    "",
-                    f"**Details:**",
-                    f"- Start Time: {format_timestamp(event.get('start_time', 0))}",
-                    f"- End Time: {format_timestamp(event.get('end_time', 0))}",
-                    f"- Clip Path: `{event.get('clip_path', 'N/A')}`",
-                    "",
-                    "---",
-                    ""
-                ])
-        
-        # Write markdown file
-        with open(output_path, 'w') as f:
-            f.write('\n'.join(lines))
+                buf.write(
+                    f"### Event #{event_id} - {event_type}\n"
+                    f"\n"
+                    f"**Timestamp:** {format_timestamp(center_time)} ({center_time:.2f}s)\n"
+                    f"**Duration:** {event.get('duration', 0):.2f} seconds\n"
+                    f"**Confidence:** {confidence.capitalize()}\n"
+                    f"**Frames with Detections:** {event.get('frame_count', 0)}\n"
+                    f"\n"
+                    f"**Description:**\n"
+                    f"{description}\n"
+                    f"\n"
+                    f"**Details:**\n"
+                    f"- Start Time: {format_timestamp(event.get('start_time', 0))}\n"
+                    f"- End Time: {format_timestamp(event.get('end_time', 0))}\n"
+                    f"- Clip Path: `{event.get('clip_path', 'N/A')}`\n"
+                    f"\n"
+                    f"---\n"
+                    f"\n"
+                )
+        
+        # Write markdown file (ending with a single newline): encode once and
+        # write the bytes directly, bypassing the text-mode encoding layer
+        data = buf.getvalue().encode('utf-8')
+        _write_atomic(output_path, memoryview(data)[:-1])
         
         return output_path
     
@@ -230,10 +253,12 @@ class ReportGenerator:
             json_filename = None
             md_filename = None
         
-        json_path = self.generate_json_report(video_url, video_info, events, json_filename)
-        md_path = self.generate_markdown_report(video_url, video_info, events, md_filename)
-        
-        return {
-            'json': json_path,
-            'markdown': md_path
-        }
+        # The two reports are independent, so serialize and write them concurrently
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            json_future = pool.submit(self.generate_json_report, video_url, video_info, events, json_filename)
+            md_future = pool.submit(self.generate_markdown_report, video_url, video_info, events, md_filename)
+            
+            return {
+                'json': json_future.result(),
+                'markdown': md_future.result()
+            }
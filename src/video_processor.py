@@ -2,12 +2,61 @@
 Video processing module for downloading YouTube videos and extracting frames
 """
 import os
+import re
+import json
+import functools
+import shutil
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import yt_dlp
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 from pathlib import Path
 import config
 
+try:
+    from turbojpeg import TurboJPEG
+    _tj = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    # Package or the libturbojpeg shared library is missing
+    _tj = None
+
+# Extracted frame file stem: frame_<index>_t<seconds>
+_FRAME_RE = re.compile(r'frame_(\d+)_t(\d+(?:\.\d*)?)$')
+
+# 11-character YouTube video ID in watch, youtu.be, shorts and embed URLs
+_YT_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/)([A-Za-z0-9_-]{11})')
+
+def _write_jpeg(frame_path: str, frame) -> None:
+    """
+    Encode a BGR frame as JPEG (libjpeg-turbo when available) and write it
+    (runs on a worker thread). Frames larger than config.FRAME_MAX_SIDE are
+    downscaled first.
+    """
+    max_side = config.FRAME_MAX_SIDE
+    if max_side and max(frame.shape[:2]) > max_side:
+        scale = max_side / max(frame.shape[:2])
+        frame = cv2.resize(frame, (int(frame.shape[1] * scale), int(frame.shape[0] * scale)),
+                           interpolation=cv2.INTER_AREA)
+    
+    quality = config.FRAME_JPEG_QUALITY
+    if _tj is not None:
+        data = _tj.encode(frame, quality=quality)
+    else:
+        ok, buf = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        if not ok:
+            raise ValueError(f"JPEG encoding failed: {frame_path}")
+        data = buf.tobytes()
+    with open(frame_path, 'wb') as f:
+        f.write(data)
+
+
+def parse_video_id(url: str) -> Optional[str]:
+    """Return the YouTube video ID parsed from the URL, or None if it has no recognisable ID"""
+    match = _YT_ID_RE.search(url)
+    return match.group(1) if match else None
+
 
 def download_video(url: str, output_dir: str = None) -> str:
     """
@@ -26,6 +75,15 @@ def download_video(url: str, output_dir: str = None) -> str:
     
     os.makedirs(output_dir, exist_ok=True)
     
+    # Parse the ID from the URL first so a downloaded video is found without
+    # yt-dlp's network metadata lookup
+    video_id = parse_video_id(url)
+    if video_id:
+        video_path = os.path.join(output_dir, f"{video_id}.mp4")
+        if os.path.exists(video_path):
+            print(f"   📁 Using existing video: {video_path}")
+            return video_path
+    
     # Extract video ID to check for existing file
     with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
         try:
@@ -64,6 +122,35 @@ def download_video(url: str, output_dir: str = None) -> str:
     return video_path
 
 
+def _iter_sampled_frames(cap: cv2.VideoCapture, frame_interval: int):
+    """
+    Yield (frame_number, frame) for every frame_interval-th frame of a video.
+    
+    When sampled frames are far apart (config.FRAME_SEEK_MIN_INTERVAL) the
+    capture seeks to each one, so the decoder only works from the nearest
+    keyframe. Otherwise it decodes straight through: grab() skips the color
+    conversion/copy that read() does, so only sampled frames pay for retrieve().
+    """
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if frame_interval >= config.FRAME_SEEK_MIN_INTERVAL and total_frames > 0:
+        for frame_number in range(0, total_frames, frame_interval):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield frame_number, frame
+        return
+    
+    frame_number = 0
+    while cap.grab():
+        if frame_number % frame_interval == 0:
+            ret, frame = cap.retrieve()
+            if not ret:
+                return
+            yield frame_number, frame
+        frame_number += 1
+
+
 def extract_frames(video_path: str, output_dir: str = None, fps: int = None) -> List[str]:
     """
     Extract frames from a video at specified FPS.
@@ -90,32 +177,27 @@ def extract_frames(video_path: str, output_dir: str = None, fps: int = None) ->
     os.makedirs(frame_dir, exist_ok=True)
     
     # Check if frames already exist
-    existing_frames = sorted(Path(frame_dir).glob("frame_*.jpg"))
+    with os.scandir(frame_dir) as entries:
+        existing_frames = sorted(
+            entry.name for entry in entries
+            if entry.name.startswith('frame_') and entry.name.endswith('.jpg')
+        )
     if existing_frames:
         print(f"   📁 Found {len(existing_frames)} existing frames, loading from cache...")
         frame_paths = []
-        for frame_file in existing_frames:
-            # Extract timestamp from filename: frame_000001_t123.45.jpg
-            filename = frame_file.stem
-            try:
-                parts = filename.split('_t')
-                if len(parts) == 2:
-                    timestamp = float(parts[1])
-                    # Extract frame number
-                    frame_num_part = parts[0].replace('frame_', '')
-                    frame_number = int(frame_num_part) if frame_num_part.isdigit() else 0
-                    extracted_index = int(frame_num_part) if frame_num_part.isdigit() else 0
-                else:
-                    timestamp = 0.0
-                    frame_number = 0
-                    extracted_index = 0
-            except Exception:
+        for frame_name in existing_frames:
+            # Extract frame index and timestamp from filename: frame_000001_t123.45.jpg
+            match = _FRAME_RE.match(frame_name[:-len('.jpg')])
+            if match:
+                frame_number = extracted_index = int(match.group(1))
+                timestamp = float(match.group(2))
+            else:
                 timestamp = 0.0
                 frame_number = 0
                 extracted_index = 0
             
             frame_paths.append({
-                'path': str(frame_file),
+                'path': os.path.join(frame_dir, frame_name),
                 'frame_number': frame_number,
                 'timestamp': timestamp,
                 'extracted_index': extracted_index
@@ -132,20 +214,21 @@ def extract_frames(video_path: str, output_dir: str = None, fps: int = None) ->
     frame_interval = int(video_fps / fps)  # Extract every Nth frame
     
     frame_paths = []
-    frame_count = 0
     extracted_count = 0
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    # JPEG encoding runs on worker threads (the encoders release the GIL) so it
+    # overlaps with decoding; the number of frames in flight is bounded
+    workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
         
-        # Extract frame at specified interval
-        if frame_count % frame_interval == 0:
+        for frame_count, frame in _iter_sampled_frames(cap, frame_interval):
             timestamp = frame_count / video_fps
             frame_filename = f"frame_{extracted_count:06d}_t{timestamp:.2f}.jpg"
             frame_path = os.path.join(frame_dir, frame_filename)
-            cv2.imwrite(frame_path, frame)
+            pending.append(pool.submit(_write_jpeg, frame_path, frame))
+            if len(pending) > 2 * workers:
+                pending.popleft().result()
             frame_paths.append({
                 'path': frame_path,
                 'frame_number': frame_count,
@@ -154,7 +237,9 @@ def extract_frames(video_path: str, output_dir: str = None, fps: int = None) ->
             })
             extracted_count += 1
         
-        frame_count += 1
+        # Re-raises any encode/write error
+        for future in pending:
+            future.result()
     
     cap.release()
     return frame_paths
@@ -164,12 +249,24 @@ def get_video_info(video_path: str) -> dict:
     """
     Get video metadata (duration, FPS, resolution, etc.)
     
+    Results are cached per (path, mtime), so repeated calls for an unchanged
+    video don't reopen it.
+    
     Args:
         video_path: Path to the video file
         
     Returns:
         Dictionary with video information
     """
+    if not os.path.exists(video_path):
+        raise ValueError(f"Could not open video: {video_path}")
+    # Copy so callers can't modify the cached entry
+    return dict(_video_info(video_path, os.path.getmtime(video_path)))
+
+
+@functools.lru_cache(maxsize=32)
+def _video_info(video_path: str, mtime: float) -> dict:
+    """Read video metadata with OpenCV (cached by get_video_info)."""
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise ValueError(f"Could not open video: {video_path}")
@@ -189,3 +286,92 @@ def get_video_info(video_path: str) -> dict:
         'width': width,
         'height': height
     }
+
+
+
+def probe_video_info(video_path: str) -> dict:
+    """
+    Get video metadata from the container header with ffprobe.
+    
+    Much cheaper than get_video_info since no decoder is initialized.
+    Falls back to get_video_info when ffprobe is unavailable or fails.
+    
+    Args:
+        video_path: Path to the video file
+        
+    Returns:
+        Dictionary with video information (same keys as get_video_info)
+    """
+    if shutil.which('ffprobe') is None:
+        return get_video_info(video_path)
+    
+    try:
+        out = subprocess.check_output([
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'stream=width,height,r_frame_rate,duration,nb_frames:format=duration',
+            '-of', 'json', video_path
+        ])
+        data = json.loads(out)
+        stream = data['streams'][0]
+        
+        num, den = stream['r_frame_rate'].split('/')
+        fps = int(num) / int(den) if int(den) else 0.0
+        # Stream duration is missing for some containers; use the format's
+        duration = float(stream.get('duration') or data.get('format', {}).get('duration') or 0.0)
+        nb_frames = stream.get('nb_frames')
+        frame_count = int(nb_frames) if nb_frames and nb_frames.isdigit() else int(duration * fps)
+        
+        return {
+            'fps': fps,
+            'frame_count': frame_count,
+            'duration': duration,
+            'width': int(stream['width']),
+            'height': int(stream['height'])
+        }
+    except (subprocess.CalledProcessError, OSError, KeyError, IndexError, ValueError):
+        return get_video_info(video_path)
+
+
+def transcode_to_h264(video_path: str) -> str:
+    """
+    Get a browser-playable H.264 copy of a video (moov atom first, so
+    playback can start before the whole file is downloaded).
+    
+    Clips written by OpenCV use the 'mp4v' codec, which most browsers can't
+    play. These are transcoded once with ffmpeg into a sibling '.h264.mp4'
+    file that is reused on later calls.
+    
+    Args:
+        video_path: Path to the video file
+        
+    Returns:
+        Path to the H.264 video (the original path if it is already H.264,
+        or if ffmpeg is unavailable or fails)
+    """
+    cap = cv2.VideoCapture(video_path)
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    cap.release()
+    codec = ''.join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).lower()
+    if codec in ('avc1', 'h264'):
+        return video_path
+    
+    output_path = str(Path(video_path).with_suffix('.h264.mp4'))
+    if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(video_path):
+        return output_path
+    
+    if shutil.which('ffmpeg') is None:
+        return video_path
+    
+    tmp_path = output_path + '.part'
+    try:
+        subprocess.run([
+            'ffmpeg', '-y', '-v', 'error', '-i', video_path,
+            '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p',
+            '-movflags', '+faststart', '-c:a', 'copy', '-f', 'mp4', tmp_path
+        ], check=True)
+        os.replace(tmp_path, output_path)
+        return output_path
+    except (subprocess.CalledProcessError, OSError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return video_path
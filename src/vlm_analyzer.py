@@ -2,12 +2,262 @@
 Vision Language Model analyzer using GPT-4 Vision API
 """
 import os
+import io
+import re
+import json
+import time
 import base64
-from typing import List, Dict, Optional
-from openai import OpenAI
+import struct
+import sqlite3
+import asyncio
+import hashlib
+import functools
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set
+import httpx
+from openai import OpenAI, AsyncOpenAI
+import numpy as np
 from PIL import Image
 import config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # HTTP/2 support for httpx: concurrent VLM requests share one connection
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    # SIMD-accelerated base64 (same API as the standard library)
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    from base64 import b64encode as _b64encode
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _file_key(path: str) -> tuple:
+    """(path, mtime, size) cache key, so edited or replaced frames are re-read"""
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _existing_frame_paths(events: List[Dict]) -> Set[str]:
+    """
+    Paths of the event frames that exist on disk, from one directory listing
+    per frame directory instead of an os.path.exists call per frame.
+    """
+    frame_dirs = set()
+    for event in events:
+        for frame in (*event.get('frames', []), event.get('representative_frame', {})):
+            path = frame.get('path')
+            if path:
+                frame_dirs.add(os.path.dirname(path))
+    
+    known_paths = set()
+    for frame_dir in frame_dirs:
+        try:
+            with os.scandir(frame_dir or '.') as entries:
+                known_paths.update(os.path.join(frame_dir, entry.name) for entry in entries)
+        except OSError:
+            continue
+    return known_paths
+
+
+def _response_format(name: str, event_types: List[str], narrative: bool = False) -> Dict:
+    """Strict JSON schema for a frame (or, with narrative, clip sequence) analysis response"""
+    properties = {
+        'event_type': {'type': 'string', 'enum': list(event_types)},
+        'description': {'type': 'string'},
+        'confidence': {'type': 'string', 'enum': ['high', 'medium', 'low']},
+    }
+    if narrative:
+        properties['narrative'] = {'type': 'string'}
+    return {
+        'type': 'json_schema',
+        'json_schema': {
+            'name': name,
+            'strict': True,
+            'schema': {
+                'type': 'object',
+                'properties': properties,
+                'required': list(properties),
+                'additionalProperties': False
+            }
+        }
+    }
+
+
+_DATA_URL_PREFIX = "data:image/jpeg;base64,"
+
+# Response fields: the text after the first colon of the first line mentioning the label
+_DESCRIPTION_RE = re.compile(r'^(?=[^\n]*description:)[^:\n]*:([^\n]*)', re.IGNORECASE | re.MULTILINE)
+_NARRATIVE_RE = re.compile(r'^(?=[^\n]*narrative:)[^:\n]*:([^\n]*)', re.IGNORECASE | re.MULTILINE)
+_FIELD_LABEL_RE = re.compile(r'event_type:|description:|confidence:|narrative:', re.IGNORECASE)
+_CONFIDENCE_PATTERNS = [
+    (level, re.compile(f'confidence: {level}|{level} confidence', re.IGNORECASE))
+    for level in ('high', 'medium', 'low')
+]
+
+# Vote weight of a frame analysis by its confidence
+_CONFIDENCE_WEIGHTS = {'high': 3, 'medium': 2, 'low': 1}
+
+# COCO classes whose presence means collection activity (or an obstruction) may be happening:
+# person, car, motorcycle, bus, truck
+_ACTIVITY_CLASSES = np.array([0, 2, 3, 5, 7])
+
+def _batched_response_format(event_types: List[str]) -> Dict:
+    """Strict JSON schema for a multi-event response: one answer per EVENT_<n> image"""
+    answer = _response_format('answer', event_types)['json_schema']['schema']
+    answer = {**answer, 'properties': {'event': {'type': 'integer'}, **answer['properties']}}
+    answer['required'] = list(answer['properties'])
+    return {
+        'type': 'json_schema',
+        'json_schema': {
+            'name': 'events_analysis',
+            'strict': True,
+            'schema': {
+                'type': 'object',
+                'properties': {'answers': {'type': 'array', 'items': answer}},
+                'required': ['answers'],
+                'additionalProperties': False
+            }
+        }
+    }
+
+
+# One "EVENT_<n>: ..." answer line of a multi-event response
+_BATCHED_ANSWER_RE = re.compile(r'^\W*EVENT_(\d+)\W*:\s*(.+)$', re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=128)
+def _file_data_url(path: str, mtime_ns: int, size: int) -> str:
+    """
+    JPEG data URL of a file, built in one allocation from the base64 bytes
+    (cached: consensus and clip analyses send the same frames again)
+    """
+    with open(path, "rb") as image_file:
+        return (_DATA_URL_PREFIX.encode('ascii') + _b64encode(image_file.read())).decode('ascii')
+
+
+def _header_size(image_file) -> Optional[tuple]:
+    """(width, height) from a JPEG or PNG header, or None if it can't be read that way"""
+    head = image_file.read(24)
+    if head[:8] == b'\x89PNG\r\n\x1a\n' and len(head) == 24:
+        return struct.unpack('>II', head[16:24])
+    if head[:2] != b'\xff\xd8':
+        return None
+    # JPEG: walk the marker segments up to the start-of-frame (SOF0-SOF15, except DHT/JPG/DAC)
+    image_file.seek(2)
+    while True:
+        marker = image_file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] == 0xFF:
+            image_file.seek(-1, os.SEEK_CUR)  # Fill byte before a marker
+            continue
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue  # Standalone markers without a length
+        length_bytes = image_file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            sof = image_file.read(5)
+            if len(sof) < 5:
+                return None
+            height, width = struct.unpack('>xHH', sof)
+            return width, height
+        image_file.seek(length - 2, os.SEEK_CUR)
+
+
+@functools.lru_cache(maxsize=4096)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """SHA-256 of a file's contents (identical frames from different runs share a digest)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _open_result_db() -> Optional[sqlite3.Connection]:
+    """
+    Open the persistent VLM result cache (config.VLM_CACHE_DIR/results.sqlite),
+    dropping entries older than config.VLM_RESULT_TTL_DAYS. Returns None if
+    the database can't be opened.
+    """
+    try:
+        os.makedirs(config.VLM_CACHE_DIR, exist_ok=True)
+        db = sqlite3.connect(os.path.join(config.VLM_CACHE_DIR, 'results.sqlite'))
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('CREATE TABLE IF NOT EXISTS results ('
+                   'key TEXT PRIMARY KEY, response_json TEXT NOT NULL, created_at INTEGER NOT NULL'
+                   ') WITHOUT ROWID')
+        db.execute('DELETE FROM results WHERE created_at < ?',
+                   (int(time.time() - config.VLM_RESULT_TTL_DAYS * 86400),))
+        db.commit()
+        return db
+    except (OSError, sqlite3.Error) as e:
+        print(f"   ⚠️  VLM result cache unavailable ({e})")
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _image_size(path: str, mtime_ns: int, size: int) -> tuple:
+    """(width, height) of an image file, parsed from its header once (PIL for other formats)"""
+    with open(path, 'rb') as image_file:
+        dims = _header_size(image_file)
+    if dims is not None:
+        return dims
+    with Image.open(path) as img:
+        return img.size
+
+
+@functools.lru_cache(maxsize=4096)
+def _upload_image(path: str, mtime_ns: int, size: int) -> str:
+    """
+    Path of the image to send to the VLM: frames larger than
+    config.VLM_MAX_IMAGE_SIDE are downscaled once per (path, mtime, size)
+    into config.VLM_FRAMES_DIR. Falls back to the original if the
+    downscaled copy can't be written.
+    """
+    max_side = config.VLM_MAX_IMAGE_SIDE
+    try:
+        if max(_image_size(path, mtime_ns, size)) <= max_side:
+            return path
+        key = hashlib.sha1(f"{os.path.abspath(path)}|{mtime_ns}|{size}|{max_side}".encode()).hexdigest()
+        small_path = os.path.join(config.VLM_FRAMES_DIR, f"{key}.jpg")
+        if not os.path.exists(small_path):
+            os.makedirs(config.VLM_FRAMES_DIR, exist_ok=True)
+            with Image.open(path) as img:
+                img.draft('RGB', (max_side, max_side))  # JPEG: decode at reduced scale
+                img = img.convert('RGB')
+                img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+                # Per-thread temporary name: frames can be prepared on several threads
+                tmp_path = f"{small_path}.{threading.get_ident()}.part"
+                img.save(tmp_path, 'JPEG', quality=85, optimize=True)
+            os.replace(tmp_path, small_path)
+        return small_path
+    except OSError:
+        return path
+
 
 class VLMAnalyzer:
     """Analyzes video events using GPT-4 Vision API"""
@@ -17,8 +267,10 @@ class VLMAnalyzer:
     # High detail (>1024x1024): $0.03 per image
     COST_PER_STANDARD_IMAGE = 0.01  # USD
     COST_PER_HIGH_DETAIL_IMAGE = 0.03  # USD
+    BATCH_DISCOUNT = 0.5  # Batch API requests are billed at half price
     
-    def __init__(self, api_key: str = None, model: str = None, max_cost: float = 1.0):
+    def __init__(self, api_key: str = None, model: str = None, max_cost: float = 1.0,
+                 batch_mode: bool = False, use_cache: bool = True, events_per_request: int = 1):
         """
         Initialize the VLM analyzer.
         
@@ -26,39 +278,98 @@ class VLMAnalyzer:
             api_key: OpenAI API key (default: from config)
             model: Model name (default: from config)
             max_cost: Maximum cost in USD to spend (default: 1.0)
+            batch_mode: Submit analyze_events requests through the OpenAI Batch API
+                        (half price, results can take up to 24 hours)
+            use_cache: Reuse frame analyses stored on disk by earlier runs (and store new ones)
+            events_per_request: If above 1, analyze_events judges each event on its
+                                representative frame and sends this many events per
+                                request (see analyze_events_batched)
         """
         self.api_key = api_key or config.OPENAI_API_KEY
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable or in config.py")
         
         self.model = model or config.OPENAI_MODEL
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = OpenAI(api_key=self.api_key, max_retries=config.VLM_MAX_RETRIES)
+        self.async_client = None  # Created on first async call
         self.event_types = config.EVENT_TYPES
+        # Event types offered to the VLM, formatted once for every prompt
+        self.event_types_list = "\n".join(f"- {et}" for et in self.event_types if et != "No event detected")
+        self._event_type_patterns = [(et, re.compile(re.escape(et), re.IGNORECASE)) for et in self.event_types]
+        if config.VLM_STRUCTURED_OUTPUT:
+            self._frame_format = ('Respond with a JSON object with "event_type" (from the list or "No event detected"), '
+                                  '"description" and "confidence" (high/medium/low).')
+            self._clip_format = ('Respond with a JSON object with "event_type" (from the list or "No event detected"), '
+                                 '"description", "narrative" and "confidence" (high/medium/low).')
+        else:
+            self._frame_format = """Respond in the following format:
+EVENT_TYPE: [event type from the list or "No event detected"]
+DESCRIPTION: [detailed description]
+CONFIDENCE: [high/medium/low]"""
+            self._clip_format = """Respond in this format:
+EVENT_TYPE: [event type or "No event detected"]
+DESCRIPTION: [detailed description]
+NARRATIVE: [chronological narrative of what happened in the clip]
+CONFIDENCE: [high/medium/low]"""
+        # Chat completion options (token limits sized for the requested answers)
+        self._frame_options = {'max_tokens': 250}
+        self._clip_options = {'max_tokens': 450}
+        if config.VLM_STRUCTURED_OUTPUT:
+            self._frame_options['response_format'] = _response_format('frame_analysis', self.event_types)
+            self._clip_options['response_format'] = _response_format('clip_analysis', self.event_types, narrative=True)
+            self._batched_response_format = _batched_response_format(self.event_types)
         self.max_cost = max_cost
         self.total_cost = 0.0
         self.images_analyzed = 0
         self.cost_exceeded = False
+        self.batch_mode = batch_mode
+        self.events_per_request = events_per_request
+        # Prepares (downscales and base64-encodes) frames while requests are in flight
+        self._encode_pool = ThreadPoolExecutor(max_workers=4)
+        # Recent frame analyses: request key -> analysis (LRU), backed by an on-disk cache
+        self._frame_results = OrderedDict()
+        self._result_db = _open_result_db() if use_cache else None
     
     def encode_image(self, image_path: str) -> str:
         """
         Encode image to base64 for API.
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file, or an in-memory "data:image/jpeg;base64,..." URL
             
         Returns:
             Base64 encoded image string
         """
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+        return self.image_url(image_path).split(',', 1)[1]
+    
+    def image_url(self, image_path: str) -> str:
+        """
+        Data URL of an image for the API's image_url content.
+        
+        Args:
+            image_path: Path to image file, or an in-memory "data:image/jpeg;base64,..." URL
+                        (returned as is)
+        """
+        if image_path.startswith('data:'):
+            # Already encoded in memory (see analyze_clip.extract_clip_frames_datauri)
+            return image_path
+        return _file_data_url(*_file_key(_upload_image(*_file_key(image_path))))
     
     def _calculate_image_cost(self, image_path: str) -> float:
-        """Calculate cost for analyzing an image based on resolution."""
+        """Calculate cost for analyzing an image based on resolution (and batch pricing)."""
+        cost = self._image_price(image_path)
+        return cost * self.BATCH_DISCOUNT if self.batch_mode else cost
+    
+    def _image_price(self, image_path: str) -> float:
+        """List price of one image at its resolution."""
         try:
-            with Image.open(image_path) as img:
-                width, height = img.size
-                max_dimension = max(width, height)
-                return self.COST_PER_STANDARD_IMAGE if max_dimension <= 1024 else self.COST_PER_HIGH_DETAIL_IMAGE
+            if image_path.startswith('data:'):
+                with Image.open(io.BytesIO(base64.b64decode(image_path.split(',', 1)[1]))) as img:
+                    width, height = img.size
+            else:
+                width, height = _image_size(*_file_key(_upload_image(*_file_key(image_path))))
+            max_dimension = max(width, height)
+            return self.COST_PER_STANDARD_IMAGE if max_dimension <= 1024 else self.COST_PER_HIGH_DETAIL_IMAGE
         except Exception:
             return self.COST_PER_STANDARD_IMAGE
     
@@ -80,16 +391,13 @@ class VLMAnalyzer:
             'budget_utilization': f"{(self.total_cost / self.max_cost * 100):.1f}%" if self.max_cost > 0 else "N/A"
         }
     
-    def analyze_frame(self, frame_path: str, context: str = None) -> Dict:
+    def _build_frame_request(self, frame_path: str, context: str = None) -> tuple:
         """
-        Analyze a single frame using GPT-4 Vision.
+        Build the chat request for a single frame.
         
-        Args:
-            frame_path: Path to the frame image
-            context: Optional context about the video/event
-            
         Returns:
-            Dictionary with analysis results
+            (early_result, cost, messages_content) - early_result is set when
+            the frame is skipped without an API call
         """
         # Check cost before proceeding
         can_afford, cost = self._can_afford_analysis(frame_path)
@@ -101,20 +409,13 @@ class VLMAnalyzer:
                 'confidence': 'low',
                 'raw_response': None,
                 'cost_exceeded': True
-            }
-        
-        base64_image = self.encode_image(frame_path)
+            }, 0.0, []
         
         # Build prompt
-        # Filter out "No event detected" from the list shown to VLM
-        # Filter out "No event detected" from the list shown to VLM
-        event_types_filtered = [et for et in self.event_types if et != "No event detected"]
-        event_types_list = "\n".join([f"- {et}" for et in event_types_filtered])
-        
         prompt = f"""Analyze this image from a garbage collection video. You are looking at a clip where a garbage bin has been detected.
 
 Identify if any of these specific events is occurring:
-{event_types_list}
+{self.event_types_list}
 
 IMPORTANT: Focus on these specific scenarios:
 - "Bin missed / not collected": The bin is visible but there is NO mechanical claw, arm, or collection equipment attached to or interacting with the bin
@@ -129,72 +430,251 @@ Please provide:
 
 Context: {context or "Garbage collection video - bin detected"}
 
-Respond in the following format:
-EVENT_TYPE: [event type from the list or "No event detected"]
-DESCRIPTION: [detailed description]
-CONFIDENCE: [high/medium/low]"""
+{self._frame_format}"""
 
+        messages_content = [
+            {"type": "text", "text": prompt},
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": self.image_url(frame_path)
+                }
+            }
+        ]
+        
+        return None, cost, messages_content
+    
+    def _frame_result(self, result_text: str, cost: float, finish_reason: str = None) -> Dict:
+        """Parse a single frame response into an analysis dictionary."""
+        if finish_reason == 'length':
+            # Cut off at max_tokens: the (JSON) answer is incomplete, so don't guess at it
+            return {
+                'event_type': 'No event detected',
+                'description': 'Error analyzing frame: response truncated at max_tokens',
+                'confidence': 'low',
+                'raw_response': result_text,
+                'error': 'Response truncated at max_tokens',
+                'cost': cost
+            }
+        
+        parsed = self._parse_response(result_text)
+        
+        return {
+            'event_type': parsed['event_type'],
+            'description': parsed['description'],
+            'confidence': parsed['confidence'],
+            'raw_response': result_text,
+            'cost': cost
+        }
+    
+    @staticmethod
+    def _frame_error(e: Exception) -> Dict:
+        """Analysis dictionary for a failed frame request (failed requests aren't charged)."""
+        return {
+            'event_type': 'No event detected',
+            'description': f'Error analyzing frame: {str(e)}',
+            'confidence': 'low',
+            'raw_response': None,
+            'error': str(e),
+            'cost': 0.0
+        }
+    
+    FRAME_RESULT_CACHE_SIZE = 256
+    BATCHED_TOKENS_PER_EVENT = 150  # Answer budget per image of a multi-event request
+    
+    def _frame_result_key(self, frame_path: str, context: str = None) -> Optional[str]:
+        """
+        Cache key of a frame analysis: hash of the frame contents, model and
+        prompt inputs. None for frames that can't be keyed (in-memory or missing).
+        """
+        if frame_path.startswith('data:'):
+            return None
+        try:
+            digest = _file_digest(*_file_key(frame_path))
+        except OSError:
+            return None
+        parts = (digest, self.model, str(config.VLM_MAX_IMAGE_SIDE), self.event_types_list, context or '')
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+    
+    def _cached_frame_result(self, key: Optional[str]) -> Optional[Dict]:
+        """Previous analysis of the same frame and prompt (this run or on disk), returned free of charge"""
+        if key is None:
+            return None
+        result = self._frame_results.get(key)
+        if result is not None:
+            self._frame_results.move_to_end(key)
+        elif self._result_db is not None:
+            try:
+                row = self._result_db.execute('SELECT response_json FROM results WHERE key = ?', (key,)).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                return None
+            result = _loads(row[0])
+            self._remember_frame_result(key, result)
+        else:
+            return None
+        return {**result, 'cost': 0.0, 'cache_hit': True}
+    
+    def _remember_frame_result(self, key: str, result: Dict) -> None:
+        """Keep a frame analysis in the in-memory LRU"""
+        self._frame_results[key] = result
+        if len(self._frame_results) > self.FRAME_RESULT_CACHE_SIZE:
+            self._frame_results.popitem(last=False)
+    
+    def _store_frame_result(self, key: Optional[str], result: Dict) -> Dict:
+        """Remember a successful frame analysis in memory and on disk"""
+        if key is not None and 'error' not in result:
+            self._remember_frame_result(key, result)
+            if self._result_db is not None:
+                try:
+                    self._result_db.execute(
+                        'INSERT OR REPLACE INTO results (key, response_json, created_at) VALUES (?, ?, ?)',
+                        (key, _dumps(result).decode('utf-8'), int(time.time()))
+                    )
+                    self._result_db.commit()
+                except sqlite3.Error as e:
+                    # The analysis was paid for; losing the disk copy is only a cache miss next run
+                    print(f"   ⚠️  Could not save VLM result to cache ({e})")
+        return result
+    
+    def analyze_frame(self, frame_path: str, context: str = None) -> Dict:
+        """
+        Analyze a single frame using GPT-4 Vision.
+        
+        Args:
+            frame_path: Path to the frame image
+            context: Optional context about the video/event
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        key = self._frame_result_key(frame_path, context)
+        cached = self._cached_frame_result(key)
+        if cached is not None:
+            return cached
+        
+        early_result, cost, messages_content = self._build_frame_request(frame_path, context)
+        if early_result is not None:
+            return early_result
+        
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
                         "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
-                                }
-                            }
-                        ]
+                        "content": messages_content
                     }
                 ],
-                max_tokens=500
+                **self._frame_options
             )
             
             # Track cost after successful API call
             self.total_cost += cost
             self.images_analyzed += 1
             
-            result_text = response.choices[0].message.content
-            
-            # Parse response
-            event_type = self._parse_event_type(result_text)
-            description = self._parse_description(result_text)
-            confidence = self._parse_confidence(result_text)
-            
-            return {
-                'event_type': event_type,
-                'description': description,
-                'confidence': confidence,
-                'raw_response': result_text,
-                'cost': cost
-            }
+            choice = response.choices[0]
+            result = self._frame_result(choice.message.content, cost, choice.finish_reason)
         
         except Exception as e:
             # Don't charge for failed requests
-            return {
-                'event_type': 'No event detected',
-                'description': f'Error analyzing frame: {str(e)}',
-                'confidence': 'low',
-                'raw_response': None,
-                'error': str(e),
-                'cost': 0.0
-            }
+            return self._frame_error(e)
+        
+        return self._store_frame_result(key, result)
     
-    def analyze_event(self, event: Dict, video_context: Dict = None) -> Dict:
+    async def analyze_frame_async(self, frame_path: str, context: str = None) -> Dict:
         """
-        Analyze an event using multiple frames from the clip for better context.
+        Async version of analyze_frame, for running many events concurrently.
         
-        Args:
-            event: Event dictionary with frames and clip information
-            video_context: Optional video metadata for context
+        The cost of the frame is reserved before the request is sent, so
+        concurrent calls cannot overrun max_cost; it is released if the request fails.
+        """
+        key = self._frame_result_key(frame_path, context)
+        cached = self._cached_frame_result(key)
+        if cached is not None:
+            return cached
+        
+        if not self.cost_exceeded:
+            # Prepare the image on the encode pool so the event loop keeps serving other requests
+            try:
+                await asyncio.get_running_loop().run_in_executor(self._encode_pool, self.image_url, frame_path)
+            except Exception:
+                pass  # Raised again (and handled as before) when the request is built
+        
+        early_result, cost, messages_content = self._build_frame_request(frame_path, context)
+        if early_result is not None:
+            return early_result
+        
+        self.total_cost += cost
+        self.images_analyzed += 1
+        
+        try:
+            if self.async_client is None:
+                self.async_client = self.new_async_client()
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": messages_content
+                    }
+                ],
+                **self._frame_options
+            )
             
+            choice = response.choices[0]
+            result = self._frame_result(choice.message.content, cost, choice.finish_reason)
+        
+        except Exception as e:
+            self.total_cost -= cost
+            self.images_analyzed -= 1
+            return self._frame_error(e)
+        
+        return self._store_frame_result(key, result)
+    
+    @staticmethod
+    def _prefilter(event: Dict) -> Optional[Dict]:
+        """
+        Free local classification (config.VLM_PREFILTER): an event whose
+        frames all have YOLO detections, none of them a person or vehicle,
+        is labelled "Bin missed / not collected". Returns None when the VLM
+        is needed.
+        """
+        frames = event.get('frames', [])
+        if not config.VLM_PREFILTER or not frames:
+            return None
+        for frame in frames:
+            detections = frame.get('detections')
+            if not frame.get('has_bin') or not hasattr(detections, 'cls'):
+                return None  # No bin in this frame, or no detections to go on
+            if np.isin(detections.cls, _ACTIVITY_CLASSES).any():
+                return None
+        return {
+            'event_type': 'Bin missed / not collected',
+            'description': 'No person or vehicle was detected near the bin in any frame of the event.',
+            'confidence': 'medium',
+            'cost': 0.0,
+            'method': 'prefilter'
+        }
+    
+    def _event_frame_paths(self, event: Dict, known_paths: Set[str] = None) -> tuple:
+        """
+        Pick the frames of an event to send to the VLM.
+        
+        Args:
+            event: Event dictionary with frames
+            known_paths: Frame paths known to exist (from _existing_frame_paths);
+                         if None, each sampled frame is checked on disk
+        
         Returns:
-            Event dictionary with added VLM analysis
+            (early_result, frame_paths) - early_result is the analyzed event
+            when it is skipped without an API call
         """
+        prefiltered = self._prefilter(event)
+        if prefiltered is not None:
+            return {**event, 'vlm_analysis': prefiltered}, []
+        
         # Stop if cost exceeded
         if self.cost_exceeded:
             return {
@@ -205,7 +685,7 @@ CONFIDENCE: [high/medium/low]"""
                     'confidence': 'low',
                     'cost_exceeded': True
                 }
-            }
+            }, []
         
         # Get all frames from the event
         event_frames = event.get('frames', [])
@@ -218,7 +698,7 @@ CONFIDENCE: [high/medium/low]"""
                     'description': 'No frames available',
                     'confidence': 'low'
                 }
-            }
+            }, []
         
         # Sample 3-5 frames: start, middle, end
         sample_indices = [0, len(event_frames) // 2, len(event_frames) - 1]
@@ -232,14 +712,17 @@ CONFIDENCE: [high/medium/low]"""
                 len(event_frames) - 1
             ]
         
-        sample_frames = [event_frames[i] for i in sample_indices if i < len(event_frames)]
-        sample_frame_paths = [f.get('path') for f in sample_frames if f.get('path') and os.path.exists(f.get('path'))]
+        exists = os.path.exists if known_paths is None else known_paths.__contains__
+        sample_frame_paths = [path for path in (event_frames[i].get('path') for i in sample_indices)
+                              if path and exists(path)]
+        # Short events sample the same frame more than once; send each frame once
+        sample_frame_paths = list(dict.fromkeys(sample_frame_paths))
         
         if not sample_frame_paths:
             # Fallback to representative frame
             representative_frame = event.get('representative_frame', {})
             frame_path = representative_frame.get('path')
-            if frame_path and os.path.exists(frame_path):
+            if frame_path and exists(frame_path):
                 sample_frame_paths = [frame_path]
             else:
                 return {
@@ -249,60 +732,59 @@ CONFIDENCE: [high/medium/low]"""
                         'description': 'No valid frames found',
                         'confidence': 'low'
                     }
-                }
+                }, []
         
-        # Analyze multiple frames and get consensus
         # Limit to 1-2 frames per event to stay within budget
         max_frames_per_event = 2 if self.max_cost >= 1.0 else 1
-        analyses = []
-        
-        for frame_path in sample_frame_paths[:max_frames_per_event]:
-            # Check if we can afford this analysis
-            if self.cost_exceeded:
-                break
-            
-            context = f"Bin detected at timestamp {event.get('center_time', 0):.2f} seconds"
-            if video_context:
-                context += f" in a {video_context.get('duration', 0):.1f} second video"
-            analysis = self.analyze_frame(frame_path, context)
-            analyses.append(analysis)
-            
-            # Stop if cost exceeded after this frame
-            if analysis.get('cost_exceeded', False):
-                break
-        
+        return None, sample_frame_paths[:max_frames_per_event]
+    
+    @staticmethod
+    def _event_context(event: Dict, video_context: Dict = None) -> str:
+        """Context line sent with each frame of an event."""
+        context = f"Bin detected at timestamp {event.get('center_time', 0):.2f} seconds"
+        if video_context:
+            context += f" in a {video_context.get('duration', 0):.1f} second video"
+        return context
+    
+    def _event_result(self, event: Dict, analyses: List[Dict], frame_paths: List[str]) -> Dict:
+        """Combine the frame analyses of an event into its consensus vlm_analysis."""
         # Get consensus - use the most confident event type
         if analyses:
-            # Count event types
-            event_type_counts = {}
+            # One pass: confidence-weighted votes per event type, the first analysis of
+            # each type (its description is reported), cost and cost-limit flags
+            event_type_counts = Counter()
+            first_analysis = {}
+            total_event_cost = 0
+            frames_analyzed = 0
+            cost_exceeded = False
             for analysis in analyses:
-                event_type = analysis.get('event_type', 'No event detected')
-                confidence = analysis.get('confidence', 'low')
-                # Weight by confidence
-                weight = {'high': 3, 'medium': 2, 'low': 1}.get(confidence, 1)
-                event_type_counts[event_type] = event_type_counts.get(event_type, 0) + weight
+                get = analysis.get
+                event_type = get('event_type', 'No event detected')
+                event_type_counts[event_type] += _CONFIDENCE_WEIGHTS.get(get('confidence', 'low'), 1)
+                first_analysis.setdefault(event_type, analysis)
+                total_event_cost += get('cost', 0)
+                if get('cost_exceeded', False):
+                    cost_exceeded = True
+                else:
+                    frames_analyzed += 1
             
-            # Get most common event type
-            if event_type_counts:
-                consensus_event = max(event_type_counts.items(), key=lambda x: x[1])[0]
-                # Get description from the analysis with this event type
-                consensus_analysis = next((a for a in analyses if a.get('event_type') == consensus_event), analyses[0])
-                
-                total_event_cost = sum(a.get('cost', 0) for a in analyses)
-                
-                return {
-                    **event,
-                    'vlm_analysis': {
-                        'event_type': consensus_event,
-                        'description': consensus_analysis.get('description', ''),
-                        'confidence': consensus_analysis.get('confidence', 'medium'),
-                        'frames_analyzed': len([a for a in analyses if not a.get('cost_exceeded', False)]),
-                        'consensus_votes': event_type_counts.get(consensus_event, 0),
-                        'cost': total_event_cost,
-                        'cost_exceeded': any(a.get('cost_exceeded', False) for a in analyses)
-                    },
-                    'analyzed_frames': sample_frame_paths[:len(analyses)]
-                }
+            # Most common event type (ties go to the type seen first)
+            consensus_event, consensus_votes = event_type_counts.most_common(1)[0]
+            consensus_analysis = first_analysis[consensus_event]
+            
+            return {
+                **event,
+                'vlm_analysis': {
+                    'event_type': consensus_event,
+                    'description': consensus_analysis.get('description', ''),
+                    'confidence': consensus_analysis.get('confidence', 'medium'),
+                    'frames_analyzed': frames_analyzed,
+                    'consensus_votes': consensus_votes,
+                    'cost': total_event_cost,
+                    'cost_exceeded': cost_exceeded
+                },
+                'analyzed_frames': frame_paths[:len(analyses)]
+            }
         
         # Fallback
         return {
@@ -314,63 +796,474 @@ CONFIDENCE: [high/medium/low]"""
             }
         }
     
-    def analyze_events(self, events: List[Dict], video_context: Dict = None) -> List[Dict]:
+    def new_async_client(self) -> AsyncOpenAI:
+        """
+        Async client whose connection pool is sized for concurrent requests
+        (multiplexed over one HTTP/2 connection when h2 is installed).
+        """
+        http_client = httpx.AsyncClient(
+            http2=_HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+        return AsyncOpenAI(api_key=self.api_key, max_retries=config.VLM_MAX_RETRIES, http_client=http_client)
+    
+    def analyze_event(self, event: Dict, video_context: Dict = None,
+                      known_paths: Set[str] = None) -> Dict:
+        """
+        Analyze an event using multiple frames from the clip for better context.
+        
+        Args:
+            event: Event dictionary with frames and clip information
+            video_context: Optional video metadata for context
+            known_paths: Frame paths known to exist (see _event_frame_paths)
+            
+        Returns:
+            Event dictionary with added VLM analysis
+        """
+        early_result, frame_paths = self._event_frame_paths(event, known_paths)
+        if early_result is not None:
+            return early_result
+        
+        # Analyze multiple frames and get consensus
+        context = self._event_context(event, video_context)
+        analyses = []
+        next_encode = None
+        for k, frame_path in enumerate(frame_paths):
+            # Check if we can afford this analysis
+            if self.cost_exceeded:
+                break
+            
+            if next_encode is not None:
+                next_encode.exception()  # Wait for the prefetch; errors surface in analyze_frame
+            # Prepare the next frame while this frame's request is in flight
+            if k + 1 < len(frame_paths):
+                next_encode = self._encode_pool.submit(self.image_url, frame_paths[k + 1])
+            
+            analysis = self.analyze_frame(frame_path, context)
+            analyses.append(analysis)
+            
+            # Stop if cost exceeded after this frame
+            if analysis.get('cost_exceeded', False):
+                break
+        
+        return self._event_result(event, analyses, frame_paths)
+    
+    async def analyze_event_async(self, event: Dict, video_context: Dict = None,
+                                  known_paths: Set[str] = None) -> Dict:
+        """Async version of analyze_event (frames of one event are still analyzed in order)."""
+        early_result, frame_paths = self._event_frame_paths(event, known_paths)
+        if early_result is not None:
+            return early_result
+        
+        context = self._event_context(event, video_context)
+        analyses = []
+        for frame_path in frame_paths:
+            if self.cost_exceeded:
+                break
+            
+            analysis = await self.analyze_frame_async(frame_path, context)
+            analyses.append(analysis)
+            
+            if analysis.get('cost_exceeded', False):
+                break
+        
+        return self._event_result(event, analyses, frame_paths)
+    
+    def analyze_events(self, events: List[Dict], video_context: Dict = None,
+                       concurrency: int = None) -> List[Dict]:
         """
-        Analyze multiple events.
+        Analyze multiple events, with up to `concurrency` VLM requests in flight.
         
         Args:
             events: List of event dictionaries
             video_context: Optional video metadata
+            concurrency: Events analyzed at once (default: config.VLM_CONCURRENCY)
             
         Returns:
-            List of events with VLM analysis added
+            List of events with VLM analysis added (in the same order as events)
         """
-        analyzed_events = []
-        
+        if self.batch_mode:
+            print(f"   💰 Budget: ${self.max_cost:.2f} | Analyzing up to {len(events)} events (Batch API)...")
+            analyzed_events = self._analyze_events_batch(events, video_context)
+            self._print_cost_summary()
+            return analyzed_events
+        if self.events_per_request > 1:
+            print(f"   💰 Budget: ${self.max_cost:.2f} | Analyzing up to {len(events)} events "
+                  f"({self.events_per_request} per request)...")
+            analyzed_events = self.analyze_events_batched(events, video_context, self.events_per_request)
+            self._print_cost_summary()
+            return analyzed_events
+        return asyncio.run(self.analyze_events_async(events, video_context, concurrency))
+    
+    async def analyze_events_async(self, events: List[Dict], video_context: Dict = None,
+                                   concurrency: int = None) -> List[Dict]:
+        """Async version of analyze_events."""
         print(f"   💰 Budget: ${self.max_cost:.2f} | Analyzing up to {len(events)} events...")
         
-        for i, event in enumerate(events):
-            if self.cost_exceeded:
-                print(f"   ⚠️  Cost limit reached at event {i+1}/{len(events)}. Remaining events will be skipped.")
-                # Mark remaining events as skipped
-                for remaining_event in events[i:]:
-                    analyzed_events.append({
-                        **remaining_event,
+        sem = asyncio.Semaphore(concurrency or config.VLM_CONCURRENCY)
+        known_paths = _existing_frame_paths(events)
+        completed = 0
+        skipped = 0
+        
+        async def analyze(event: Dict) -> Dict:
+            nonlocal completed, skipped
+            async with sem:
+                if self.cost_exceeded:
+                    # Budget ran out while this event was waiting its turn
+                    skipped += 1
+                    analyzed_event = {
+                        **event,
                         'vlm_analysis': {
                             'event_type': 'No event detected',
                             'description': f'Cost limit reached. Skipped analysis.',
                             'confidence': 'low',
                             'cost_exceeded': True
                         }
-                    })
-                break
-            
-            analyzed_event = self.analyze_event(event, video_context)
-            analyzed_events.append(analyzed_event)
+                    }
+                else:
+                    analyzed_event = await self.analyze_event_async(event, video_context, known_paths)
             
             # Print progress periodically
-            if (i + 1) % 10 == 0 or i == len(events) - 1:
+            completed += 1
+            if completed % 10 == 0 or completed == len(events):
                 cost_summary = self.get_cost_summary()
-                print(f"   📊 Progress: {i+1}/{len(events)} events | Cost: ${cost_summary['total_cost']:.2f} / ${self.max_cost:.2f} ({cost_summary['budget_utilization']})")
+                print(f"   📊 Progress: {completed}/{len(events)} events | Cost: ${cost_summary['total_cost']:.2f} / ${self.max_cost:.2f} ({cost_summary['budget_utilization']})")
+            return analyzed_event
+        
+        # One client per event loop: httpx connections can't be reused across asyncio.run calls
+        self.async_client = self.new_async_client()
+        try:
+            analyzed_events = await asyncio.gather(*[analyze(event) for event in events])
+        finally:
+            await self.async_client.close()
+            self.async_client = None
+        
+        if skipped:
+            print(f"   ⚠️  Cost limit reached. {skipped}/{len(events)} events were skipped.")
         
-        # Final cost summary
+        self._print_cost_summary()
+        return analyzed_events
+    
+    def _print_cost_summary(self) -> None:
+        """Print the final cost summary of an analyze_events run."""
         cost_summary = self.get_cost_summary()
         print(f"\n   💵 Final Cost: ${cost_summary['total_cost']:.2f} / ${self.max_cost:.2f}")
         print(f"   📸 Images Analyzed: {cost_summary['images_analyzed']}")
         print(f"   📊 Budget Utilization: {cost_summary['budget_utilization']}")
+    
+    def _analyze_events_batch(self, events: List[Dict], video_context: Dict = None) -> List[Dict]:
+        """
+        Analyze events through the OpenAI Batch API.
+        
+        Every affordable frame request is written to one JSONL batch (the
+        budget is reserved up front, at batch prices), the batch is polled
+        until it finishes, and the responses are matched back to their events
+        by custom_id. Frames with a cached analysis are not resubmitted, and
+        requests that fail or are missing from the output are not charged.
+        """
+        analyzed_events = [None] * len(events)
+        pending = {}  # event index -> (frame paths, [(custom_id, cost, early_analysis, cache key)])
+        lines = []
+        known_paths = _existing_frame_paths(events)
+        for i, event in enumerate(events):
+            early_result, frame_paths = self._event_frame_paths(event, known_paths)
+            if early_result is not None:
+                analyzed_events[i] = early_result
+                continue
+            
+            context = self._event_context(event, video_context)
+            frame_requests = []
+            for k, frame_path in enumerate(frame_paths):
+                key = self._frame_result_key(frame_path, context)
+                cached = self._cached_frame_result(key)
+                if cached is not None:
+                    frame_requests.append((None, 0.0, cached, key))
+                    continue
+                
+                early_analysis, cost, messages_content = self._build_frame_request(frame_path, context)
+                if early_analysis is not None:
+                    frame_requests.append((None, 0.0, early_analysis, key))
+                    break
+                
+                custom_id = f"{i}-{k}"
+                lines.append(_dumps({
+                    'custom_id': custom_id,
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': {
+                        'model': self.model,
+                        'messages': [{'role': 'user', 'content': messages_content}],
+                        **self._frame_options
+                    }
+                }))
+                self.total_cost += cost
+                self.images_analyzed += 1
+                frame_requests.append((custom_id, cost, None, key))
+            pending[i] = (frame_paths, frame_requests)
+        
+        responses = self._run_batch(lines) if lines else {}
+        
+        for i, (frame_paths, frame_requests) in pending.items():
+            analyses = []
+            for custom_id, cost, early_analysis, key in frame_requests:
+                if early_analysis is not None:
+                    analyses.append(early_analysis)
+                    continue
+                response = responses.get(custom_id, RuntimeError('No result in batch output'))
+                if isinstance(response, Exception):
+                    self.total_cost -= cost
+                    self.images_analyzed -= 1
+                    analyses.append(self._frame_error(response))
+                else:
+                    analyses.append(self._store_frame_result(
+                        key, self._frame_result(response['message']['content'], cost, response.get('finish_reason'))
+                    ))
+            analyzed_events[i] = self._event_result(events[i], analyses, frame_paths)
         
         return analyzed_events
     
-    def analyze_clip_sequence(self, frame_paths: List[str], clip_info: Dict = None) -> Dict:
+    def _run_batch(self, lines: List[bytes]) -> Dict:
         """
-        Analyze a video clip by examining multiple frames together to get a narrative description.
+        Submit chat completion requests as one Batch API job and wait for it.
+        
+        Returns:
+            Dictionary of custom_id -> response choice (message and finish_reason), or the exception for failed requests
+        """
+        batch_file = self.client.files.create(
+            file=('vlm_requests.jsonl', b'\n'.join(lines)),
+            purpose='batch'
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+        print(f"   📦 Submitted batch {batch.id} with {len(lines)} requests, waiting for results...")
+        
+        # Poll with exponential backoff (batches usually take minutes to hours)
+        delay = 5
+        while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+            time.sleep(delay)
+            delay = min(delay * 2, 300)
+            batch = self.client.batches.retrieve(batch.id)
+        
+        if batch.status != 'completed':
+            print(f"   ⚠️  Batch {batch.id} {batch.status}; requests without a result are reported as errors")
+        
+        responses = {}
+        # Expired and cancelled batches can still have partial output
+        if batch.output_file_id:
+            for line in self.client.files.content(batch.output_file_id).content.splitlines():
+                item = _loads(line)
+                response = item.get('response') or {}
+                if response.get('status_code') == 200:
+                    responses[item['custom_id']] = response['body']['choices'][0]
+                else:
+                    responses[item['custom_id']] = RuntimeError(str(item.get('error') or response.get('body')))
+        return responses
+    
+    def analyze_events_batched(self, events: List[Dict], video_context: Dict = None,
+                               batch_size: int = 10) -> List[Dict]:
+        """
+        Analyze events with several events per request: the representative
+        frame of each of up to batch_size events is sent in one multi-image
+        request, saving the per-request overhead of one call per event.
+        
+        Each event is judged on a single frame, so this trades the
+        multi-frame consensus of analyze_events for fewer, larger requests.
+        Answers are cached like single-frame analyses (under their own
+        prompt), so cached events are left out of the requests.
         
         Args:
-            frame_paths: List of frame image paths from the clip
-            clip_info: Optional information about the clip (duration, timestamp, etc.)
+            events: List of event dictionaries
+            video_context: Optional video metadata
+            batch_size: Events (images) per request (default: 10)
             
         Returns:
-            Dictionary with analysis results including narrative description
+            List of events with VLM analysis added (in the same order as events)
+        """
+        analyzed_events = [None] * len(events)
+        queued = []  # (event index, frame path, cost, cache key)
+        known_paths = _existing_frame_paths(events)
+        # Cache context: these answers come from the multi-event prompt, not the per-event one
+        batched_context = f"batched:{self._batched_video_info(video_context)}"
+        
+        for i, event in enumerate(events):
+            early_result, frame_paths = self._event_frame_paths(event, known_paths)
+            if early_result is not None:
+                analyzed_events[i] = early_result
+                continue
+            
+            representative_path = event.get('representative_frame', {}).get('path')
+            frame_path = representative_path if representative_path in known_paths else frame_paths[0]
+            key = self._frame_result_key(frame_path, batched_context)
+            cached = self._cached_frame_result(key)
+            if cached is not None:
+                analyzed_events[i] = {
+                    **event,
+                    'vlm_analysis': {**cached, 'frames_analyzed': 1, 'method': 'vlm'},
+                    'analyzed_frames': [frame_path]
+                }
+                continue
+            
+            can_afford, cost = self._can_afford_analysis(frame_path)
+            if not can_afford:
+                self.cost_exceeded = True
+                analyzed_events[i] = {
+                    **event,
+                    'vlm_analysis': {
+                        'event_type': 'No event detected',
+                        'description': f'Cost limit reached (${self.max_cost:.2f}). Skipped analysis.',
+                        'confidence': 'low',
+                        'cost_exceeded': True
+                    }
+                }
+                continue
+            self.total_cost += cost  # Reserved; released if the request fails
+            self.images_analyzed += 1
+            queued.append((i, frame_path, cost, key))
+        
+        for start in range(0, len(queued), batch_size):
+            batch = queued[start:start + batch_size]
+            analyses = self._analyze_frames_batched([frame_path for _, frame_path, _, _ in batch], video_context)
+            for (i, frame_path, cost, key), analysis in zip(batch, analyses):
+                if 'error' in analysis:
+                    self.total_cost -= cost
+                    self.images_analyzed -= 1
+                    analysis['cost'] = 0.0
+                else:
+                    analysis['cost'] = cost
+                    self._store_frame_result(key, analysis)
+                analyzed_events[i] = {
+                    **events[i],
+                    'vlm_analysis': analysis,
+                    'analyzed_frames': [frame_path]
+                }
+        
+        return analyzed_events
+    
+    @staticmethod
+    def _batched_video_info(video_context: Dict = None) -> str:
+        """Video description used in the multi-event prompt"""
+        if video_context:
+            return f" from a {video_context.get('duration', 0):.1f} second video"
+        return ""
+    
+    def _analyze_frames_batched(self, frame_paths: List[str], video_context: Dict = None) -> List[Dict]:
+        """Classify several frames (one per event) in a single request; one analysis per frame."""
+        video_info = self._batched_video_info(video_context)
+        if config.VLM_STRUCTURED_OUTPUT:
+            answer_format = ('Respond with a JSON object whose "answers" list has one entry per image, with "event" '
+                             '(the image number n), "event_type" (from the list or "No event detected"), '
+                             '"description" (short) and "confidence" (high/medium/low).')
+            options = {'response_format': self._batched_response_format}
+        else:
+            answer_format = """Respond with exactly one line per image, in order, in this format:
+EVENT_<n>: [event type from the list or "No event detected"] | [short description] | [high/medium/low]"""
+            options = {}
+        
+        prompt = f"""You are given {len(frame_paths)} images{video_info}, labelled EVENT_1 to EVENT_{len(frame_paths)}. Each image is from a different moment of a garbage collection video where a garbage bin has been detected.
+
+For each image, identify if any of these specific events is occurring:
+{self.event_types_list}
+
+IMPORTANT: Focus on these specific scenarios:
+- "Bin missed / not collected": The bin is visible but there is NO mechanical claw, arm, or collection equipment attached to or interacting with the bin
+- "Contamination detected": You can see non-recyclable waste items mixed in with recyclable materials
+- "Overflowing bin or spillage": The bin is filled to the brim and waste is protruding out or spilling over the edges
+- "Blocked access": A car, vehicle, or obstacle is parked directly in front of the bin, preventing collection access
+
+{answer_format}"""
+        
+        messages_content = [{"type": "text", "text": prompt}]
+        for n, frame_path in enumerate(frame_paths, 1):
+            messages_content.append({"type": "text", "text": f"EVENT_{n}:"})
+            messages_content.append({"type": "image_url", "image_url": {"url": self.image_url(frame_path)}})
+        
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": messages_content
+                    }
+                ],
+                max_tokens=self.BATCHED_TOKENS_PER_EVENT * len(frame_paths),
+                **options
+            )
+            result_text = response.choices[0].message.content
+        except Exception as e:
+            return [self._frame_error(e) for _ in frame_paths]
+        
+        answers = self._parse_batched_answers(result_text)
+        analyses = []
+        for n in range(1, len(frame_paths) + 1):
+            answer = answers.get(n)
+            if answer is None:
+                # Also the case for every image when the response was cut off at max_tokens
+                analyses.append(self._frame_error(RuntimeError(f'No answer for EVENT_{n} in response')))
+                continue
+            analyses.append({**answer, 'frames_analyzed': 1, 'method': 'vlm'})
+        return analyses
+    
+    def _parse_batched_answers(self, text: str) -> Dict[int, Dict]:
+        """Answers of a multi-event response by image number (JSON, or EVENT_<n> lines)"""
+        try:
+            parsed = _loads(text)
+        except (ValueError, TypeError):
+            parsed = None
+        
+        answers = {}
+        if isinstance(parsed, dict):
+            for answer in parsed.get('answers') or []:
+                if not isinstance(answer, dict) or not isinstance(answer.get('event'), int):
+                    continue
+                event_type = answer.get('event_type')
+                confidence = answer.get('confidence')
+                answers[answer['event']] = {
+                    'event_type': event_type if event_type in self.event_types else 'No event detected',
+                    'description': str(answer.get('description') or ''),
+                    'confidence': confidence if confidence in _CONFIDENCE_WEIGHTS else 'medium',
+                    'raw_response': _dumps(answer).decode('utf-8')
+                }
+            return answers
+        
+        # Split the response into its EVENT_<n> lines
+        for match in _BATCHED_ANSWER_RE.finditer(text or ''):
+            answer = match.group(2).strip()
+            parts = [part.strip() for part in answer.split('|')]
+            confidence = parts[2].lower() if len(parts) > 2 else ''
+            answers[int(match.group(1))] = {
+                'event_type': self._parse_event_type(parts[0]),
+                'description': parts[1] if len(parts) > 1 else answer,
+                'confidence': confidence if confidence in _CONFIDENCE_WEIGHTS else 'medium',
+                'raw_response': answer
+            }
+        return answers
+    
+    def _build_clip_request(self, frame_paths: List[str], clip_info: Dict = None,
+                            grid_frames: int = 0) -> tuple:
+        """
+        Build the chat request for a clip sequence.
+        
+        Returns:
+            (early_result, affordable_frames, messages_content) - early_result is
+            set when the clip is skipped without an API call
+        """
+        early_result, affordable_frames = self._select_clip_frames(frame_paths)
+        if early_result is not None:
+            return early_result, [], []
+        return None, affordable_frames, self._clip_messages(affordable_frames, clip_info, grid_frames)
+    
+    def _select_clip_frames(self, frame_paths: List[str]) -> tuple:
+        """
+        Sample the frames of a clip sequence that fit in the remaining budget.
+        
+        Returns:
+            (early_result, affordable_frames) - early_result is set when the
+            clip is skipped without an API call
         """
         if self.cost_exceeded:
             return {
@@ -379,7 +1272,7 @@ CONFIDENCE: [high/medium/low]"""
                 'confidence': 'low',
                 'narrative': '',
                 'cost_exceeded': True
-            }
+            }, []
         
         if not frame_paths:
             return {
@@ -387,7 +1280,7 @@ CONFIDENCE: [high/medium/low]"""
                 'description': 'No frames provided',
                 'confidence': 'low',
                 'narrative': ''
-            }
+            }, []
         
         # Sample frames: start, 1/3, 2/3, end (or fewer if clip is short)
         num_frames = len(frame_paths)
@@ -398,7 +1291,7 @@ CONFIDENCE: [high/medium/low]"""
         else:
             sample_indices = [0, num_frames // 3, 2 * num_frames // 3, num_frames - 1]
         
-        sample_frames = [frame_paths[i] for i in sample_indices if i < len(frame_paths)]
+        sample_frames = [frame_paths[i] for i in sample_indices]
         
         # Limit to 3-5 frames to control cost
         max_frames = min(5, len(sample_frames))
@@ -420,24 +1313,30 @@ CONFIDENCE: [high/medium/low]"""
                 'description': 'Cost limit too low for analysis',
                 'confidence': 'low',
                 'narrative': ''
-            }
+            }, []
         
+        return None, affordable_frames
+    
+    def _clip_messages(self, affordable_frames: List[str], clip_info: Dict = None,
+                       grid_frames: int = 0) -> List[Dict]:
+        """Prompt and encoded frames of a clip sequence request."""
         # Build prompt for sequence analysis
-        event_types_filtered = [et for et in self.event_types if et != "No event detected"]
-        event_types_list = "\n".join([f"- {et}" for et in event_types_filtered])
-        
         context_info = ""
         if clip_info:
             timestamp = clip_info.get('timestamp', 0)
             duration = clip_info.get('duration', 0)
             context_info = f" This clip is from timestamp {timestamp:.2f}s and is {duration:.2f} seconds long."
         
-        prompt = f"""You are analyzing a sequence of frames from a garbage collection video clip. These frames show what happened over time in a 10-second clip where a garbage bin was detected.
+        layout_info = ""
+        if grid_frames:
+            layout_info = f" This image is a grid of {grid_frames} frames in reading order (top-left to bottom-right), each one later in time than the previous."
+        
+        prompt = f"""You are analyzing a sequence of frames from a garbage collection video clip. These frames show what happened over time in a 10-second clip where a garbage bin was detected.{layout_info}
 
 Analyze the sequence of frames to understand what happened in this clip. Look for temporal patterns and changes between frames.
 
 Possible events to identify:
-{event_types_list}
+{self.event_types_list}
 
 IMPORTANT: Focus on these specific scenarios:
 - "Bin missed / not collected": The bin is visible but there is NO mechanical claw, arm, or collection equipment attached to or interacting with the bin throughout the clip
@@ -453,25 +1352,82 @@ Provide:
 
 Context:{context_info}
 
-Respond in this format:
-EVENT_TYPE: [event type or "No event detected"]
-DESCRIPTION: [detailed description]
-NARRATIVE: [chronological narrative of what happened in the clip]
-CONFIDENCE: [high/medium/low]"""
+{self._clip_format}"""
 
-        # Encode all sample frames
+        # Encode all sample frames (in parallel)
         image_contents = []
-        for frame_path in affordable_frames:
-            base64_image = self.encode_image(frame_path)
+        for url in self._encode_pool.map(self.image_url, affordable_frames):
             image_contents.append({
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/jpeg;base64,{base64_image}"
+                    "url": url
                 }
             })
         
         # Build messages with all frames
-        messages_content = [{"type": "text", "text": prompt}] + image_contents
+        return [{"type": "text", "text": prompt}] + image_contents
+    
+    def _clip_result(self, result_text: str, affordable_frames: List[str], total_cost: float,
+                     finish_reason: str = None) -> Dict:
+        """Parse a clip sequence response into an analysis dictionary."""
+        if finish_reason == 'length':
+            # Cut off at max_tokens: the (JSON) answer is incomplete, so don't guess at it
+            return {
+                'event_type': 'No event detected',
+                'description': 'Error analyzing clip: response truncated at max_tokens',
+                'narrative': '',
+                'confidence': 'low',
+                'raw_response': result_text,
+                'error': 'Response truncated at max_tokens',
+                'frames_analyzed': len(affordable_frames),
+                'cost': total_cost,
+                'method': 'vlm'
+            }
+        
+        parsed = self._parse_response(result_text)
+        
+        return {
+            'event_type': parsed['event_type'],
+            'description': parsed['description'],
+            'narrative': parsed['narrative'],
+            'confidence': parsed['confidence'],
+            'raw_response': result_text,
+            'frames_analyzed': len(affordable_frames),
+            'cost': total_cost,
+            'method': 'vlm'
+        }
+    
+    @staticmethod
+    def _clip_error(e: Exception) -> Dict:
+        """Analysis dictionary for a failed clip sequence request."""
+        return {
+            'event_type': 'No event detected',
+            'description': f'Error analyzing clip: {str(e)}',
+            'narrative': '',
+            'confidence': 'low',
+            'error': str(e),
+            'cost': 0.0
+        }
+    
+    def analyze_clip_sequence(self, frame_paths: List[str], clip_info: Dict = None,
+                              grid_frames: int = 0) -> Dict:
+        """
+        Analyze a video clip by examining multiple frames together to get a narrative description.
+        
+        Args:
+            frame_paths: List of frame image paths (or in-memory data URLs) from the clip
+            clip_info: Optional information about the clip (duration, timestamp, etc.)
+            grid_frames: If set, frame_paths holds a single grid image made of
+                         this many frames in reading order
+            
+        Returns:
+            Dictionary with analysis results including narrative description
+        """
+        early_result, affordable_frames, messages_content = self._build_clip_request(
+            frame_paths, clip_info, grid_frames
+        )
+        if early_result is not None:
+            return early_result
         
         try:
             response = self.client.chat.completions.create(
@@ -482,7 +1438,7 @@ CONFIDENCE: [high/medium/low]"""
                         "content": messages_content
                     }
                 ],
-                max_tokens=800  # More tokens for narrative
+                **self._clip_options
             )
             
             # Calculate and track cost
@@ -494,55 +1450,94 @@ CONFIDENCE: [high/medium/low]"""
             self.total_cost += total_cost
             self.images_analyzed += len(affordable_frames)
             
-            result_text = response.choices[0].message.content
-            
-            # Parse response
-            event_type = self._parse_event_type(result_text)
-            description = self._parse_description(result_text)
-            confidence = self._parse_confidence(result_text)
-            narrative = self._parse_narrative(result_text)
+            choice = response.choices[0]
+            return self._clip_result(choice.message.content, affordable_frames, total_cost, choice.finish_reason)
+        
+        except Exception as e:
+            return self._clip_error(e)
+    
+    async def analyze_clip_sequence_async(self, frame_paths: List[str], clip_info: Dict = None,
+                                          grid_frames: int = 0) -> Dict:
+        """
+        Async version of analyze_clip_sequence, for running many clips concurrently.
+        
+        The cost of the frames is reserved before the request is sent, so
+        concurrent calls cannot overrun max_cost; it is released if the request fails.
+        Frames are encoded in a worker thread so other requests keep running.
+        """
+        early_result, affordable_frames = self._select_clip_frames(frame_paths)
+        if early_result is not None:
+            return early_result
+        
+        total_cost = sum(self._calculate_image_cost(frame_path) for frame_path in affordable_frames)
+        self.total_cost += total_cost
+        self.images_analyzed += len(affordable_frames)
+        
+        try:
+            messages_content = await asyncio.to_thread(self._clip_messages, affordable_frames, clip_info, grid_frames)
+            if self.async_client is None:
+                self.async_client = self.new_async_client()
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": messages_content
+                    }
+                ],
+                **self._clip_options
+            )
             
-            return {
-                'event_type': event_type,
-                'description': description,
-                'narrative': narrative,
-                'confidence': confidence,
-                'raw_response': result_text,
-                'frames_analyzed': len(affordable_frames),
-                'cost': total_cost,
-                'method': 'vlm'
-            }
+            choice = response.choices[0]
+            return self._clip_result(choice.message.content, affordable_frames, total_cost, choice.finish_reason)
         
         except Exception as e:
+            self.total_cost -= total_cost
+            self.images_analyzed -= len(affordable_frames)
+            return self._clip_error(e)
+    
+    def _parse_response(self, text: str) -> Dict:
+        """Extract event type, description, confidence and narrative from response text"""
+        try:
+            answer = _loads(text)
+        except (ValueError, TypeError):
+            answer = None
+        if isinstance(answer, dict):
+            # Structured (JSON schema) response
+            event_type = answer.get('event_type')
+            confidence = answer.get('confidence')
             return {
-                'event_type': 'No event detected',
-                'description': f'Error analyzing clip: {str(e)}',
-                'narrative': '',
-                'confidence': 'low',
-                'error': str(e),
-                'cost': 0.0
+                'event_type': event_type if event_type in self.event_types else 'No event detected',
+                'description': str(answer.get('description') or ''),
+                'confidence': confidence if confidence in _CONFIDENCE_WEIGHTS else 'medium',
+                'narrative': str(answer.get('narrative') or '')
             }
+        
+        # Free-form "EVENT_TYPE: ..." response
+        return {
+            'event_type': self._parse_event_type(text),
+            'description': self._parse_description(text),
+            'confidence': self._parse_confidence(text),
+            'narrative': self._parse_narrative(text)
+        }
     
     def _parse_event_type(self, text: str) -> str:
         """Extract event type from response text"""
-        text_lower = text.lower()
-        
-        # Check each event type
-        for event_type in self.event_types:
-            if event_type.lower() in text_lower:
+        # Check each event type (in config order)
+        for event_type, pattern in self._event_type_patterns:
+            if pattern.search(text):
                 return event_type
         
         return 'No event detected'
     
     def _parse_description(self, text: str) -> str:
         """Extract description from response text"""
-        lines = text.split('\n')
-        for line in lines:
-            if 'description:' in line.lower():
-                return line.split(':', 1)[1].strip()
+        match = _DESCRIPTION_RE.search(text)
+        if match:
+            return match.group(1).strip()
         
         # Fallback: return first substantial line
-        for line in lines:
+        for line in text.split('\n'):
             if len(line.strip()) > 20:
                 return line.strip()
         
@@ -550,31 +1545,25 @@ CONFIDENCE: [high/medium/low]"""
     
     def _parse_confidence(self, text: str) -> str:
         """Extract confidence from response text"""
-        text_lower = text.lower()
-        
-        if 'confidence: high' in text_lower or 'high confidence' in text_lower:
-            return 'high'
-        elif 'confidence: medium' in text_lower or 'medium confidence' in text_lower:
-            return 'medium'
-        elif 'confidence: low' in text_lower or 'low confidence' in text_lower:
-            return 'low'
+        for confidence, pattern in _CONFIDENCE_PATTERNS:
+            if pattern.search(text):
+                return confidence
         
         return 'medium'  # Default
     
     def _parse_narrative(self, text: str) -> str:
         """Extract narrative description from response text"""
-        lines = text.split('\n')
-        for i, line in enumerate(lines):
-            if 'narrative:' in line.lower():
-                # Get the narrative text (might span multiple lines)
-                narrative_parts = [line.split(':', 1)[1].strip()]
-                # Check next lines for continuation
-                for j in range(i + 1, min(i + 10, len(lines))):
-                    next_line = lines[j].strip()
-                    if next_line and not any(keyword in next_line.lower() for keyword in ['event_type:', 'description:', 'confidence:', 'narrative:']):
-                        narrative_parts.append(next_line)
-                    else:
-                        break
-                return ' '.join(narrative_parts)
-        
-        return ''
+        match = _NARRATIVE_RE.search(text)
+        if not match:
+            return ''
+        
+        # Get the narrative text (might span multiple lines)
+        narrative_parts = [match.group(1).strip()]
+        # Check next lines for continuation
+        for next_line in text[match.end():].split('\n')[1:10]:
+            next_line = next_line.strip()
+            if next_line and not _FIELD_LABEL_RE.search(next_line):
+                narrative_parts.append(next_line)
+            else:
+                break
+        return ' '.join(narrative_parts)